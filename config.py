@@ -1,5 +1,6 @@
 """Unified Configuration for Orchestrator"""
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -140,6 +141,17 @@ def get_llm_backend():
         raise ValueError(f"Unsupported backend: {MODEL_BACKEND}")
 
 
+@lru_cache(maxsize=1)
+def get_shared_llm_backend():
+    """
+    Get the process-wide LLM backend shared by all agents.
+    
+    Building a crew otherwise constructs one client per agent; sharing a
+    single instance also shares its HTTP connection pool (or loaded model).
+    """
+    return get_llm_backend()
+
+
 # ========================================
 # Provider Factory (New Architecture)
 # ========================================
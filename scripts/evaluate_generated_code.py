@@ -2,7 +2,9 @@
 """Automated Code Quality Scorer for Generated Projects"""
 
 import json
+import os
 import sys
+from collections import deque
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Any
@@ -12,6 +14,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.utils.code_validator import CodeValidator
 
+# Heavy directories that never contain files we score
+SKIP_DIRS = frozenset({"node_modules", ".git", "__pycache__", "venv", ".venv"})
+
 
 class ProjectScorer:
     """Comprehensive scoring for generated projects."""
@@ -20,16 +25,34 @@ class ProjectScorer:
         self.project_dir = Path(project_dir)
         self.results = {}
     
+    def _walk(self):
+        """Yield DirEntry objects breadth-first, skipping SKIP_DIRS."""
+        pending = deque([self.project_dir])
+        while pending:
+            try:
+                with os.scandir(pending.popleft()) as it:
+                    entries = list(it)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in SKIP_DIRS:
+                        continue
+                    pending.append(entry.path)
+                yield entry
+    
     def find_main_file(self) -> Path:
         """Find the main.py file in generated directory."""
-        # Look for main.py in subdirectories
-        main_files = list(self.project_dir.rglob("main.py"))
+        # Breadth-first, so the shallowest main.py (usually the API file) wins
+        main_file = next(
+            (Path(e.path) for e in self._walk() if e.name == "main.py" and e.is_file()),
+            None,
+        )
         
-        if not main_files:
+        if main_file is None:
             raise FileNotFoundError(f"No main.py found in {self.project_dir}")
         
-        # Return the first one (usually the main API file)
-        return main_files[0]
+        return main_file
     
     def score_documentation(self) -> Dict:
         """Score documentation completeness."""
@@ -69,17 +92,17 @@ class ProjectScorer:
             "requirements.txt": 2,
         }
         
-        score = 0
-        found_items = {}
+        # Single walk matching any file or directory name containing an item;
+        # stop as soon as every item has been seen
+        remaining = set(required_items)
+        for entry in self._walk():
+            matched = [item for item in remaining if item in entry.name]
+            remaining.difference_update(matched)
+            if not remaining:
+                break
         
-        for item, points in required_items.items():
-            # Check if file or directory exists
-            matches = list(self.project_dir.rglob(f"*{item}*"))
-            if matches:
-                found_items[item] = True
-                score += points
-            else:
-                found_items[item] = False
+        found_items = {item: item not in remaining for item in required_items}
+        score = sum(points for item, points in required_items.items() if found_items[item])
         
         return {
             "score": score,
@@ -159,30 +182,31 @@ class ProjectScorer:
     def _generate_recommendations(self, code, docs, structure) -> List[str]:
         """Generate actionable recommendations."""
         recs = []
+        add = recs.append
+        results = code.get("results") or {}
+        imports = results.get("imports") or {}
+        endpoints = results.get("endpoints") or {}
         
-        if not code.get("results", {}).get("imports", {}).get("passed"):
-            missing = code["results"]["imports"]["missing"]
-            recs.append(f"Add missing imports: {', '.join(missing[:5])}")
+        if not imports.get("passed"):
+            add(f"Add missing imports: {', '.join(imports['missing'][:5])}")
         
-        if not code.get("results", {}).get("endpoints", {}).get("passed"):
-            found = code["results"]["endpoints"]["total"]
-            expected = code["results"]["endpoints"]["expected"]
-            recs.append(f"Implement all endpoints: found {found}, need {expected}")
+        if not endpoints.get("passed"):
+            add(f"Implement all endpoints: found {endpoints['total']}, need {endpoints['expected']}")
         
-        if not code.get("results", {}).get("implementations", {}).get("passed"):
-            recs.append("Replace pass statements with actual implementations")
+        if not (results.get("implementations") or {}).get("passed"):
+            add("Replace pass statements with actual implementations")
         
-        if not code.get("results", {}).get("syntax", {}).get("passed"):
-            recs.append("Fix syntax errors before deployment")
+        if not (results.get("syntax") or {}).get("passed"):
+            add("Fix syntax errors before deployment")
         
         if not docs.get("passed"):
-            recs.append("Add missing documentation files")
+            add("Add missing documentation files")
         
         if not structure.get("passed"):
-            recs.append("Complete project structure (tests, migrations)")
+            add("Complete project structure (tests, migrations)")
         
         if not recs:
-            recs.append("Code is excellent! Ready for production deployment.")
+            add("Code is excellent! Ready for production deployment.")
         
         return recs
     
@@ -263,15 +287,22 @@ def main():
         action="store_true",
         help="Print detailed report to console"
     )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Suppress console output (JSON report is still written)"
+    )
     
     args = parser.parse_args()
     
     scorer = ProjectScorer(args.project_dir)
     report = scorer.generate_full_report()
     
-    # Print to console
-    if args.verbose or True:  # Always print for now
+    # Print to console: full report for humans, one-line summary when piped
+    if args.verbose or (not args.quiet and sys.stdout.isatty()):
         scorer.print_report(report)
+    elif not args.quiet:
+        print(json.dumps({"grade": report["grade"], "passed": report["passed"]}))
     
     # Save JSON report
     output_path = Path(args.output)
@@ -280,7 +311,8 @@ def main():
     with open(output_path, 'w') as f:
         json.dump(report, f, indent=2)
     
-    print(f"Report saved to: {output_path}")
+    if not args.quiet:
+        print(f"Report saved to: {output_path}")
     
     # Exit with appropriate code
     sys.exit(0 if report.get("passed", False) else 1)
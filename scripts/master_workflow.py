@@ -9,17 +9,22 @@ import subprocess
 import json
 from pathlib import Path
 from typing import Dict, Any, Optional
-from enum import Enum
+from enum import IntEnum
 from datetime import datetime
 
-class WorkflowPhase(Enum):
-    RESEARCH = "research"
-    PLANNING = "planning"
-    DEVELOPMENT = "development"
-    TESTING = "testing"
-    DEPLOYMENT = "deployment"
-    DOCUMENTATION = "documentation"
-    COMPLETE = "complete"
+class WorkflowPhase(IntEnum):
+    RESEARCH = 0
+    PLANNING = 1
+    DEVELOPMENT = 2
+    TESTING = 3
+    DEPLOYMENT = 4
+    DOCUMENTATION = 5
+    COMPLETE = 6
+
+    @property
+    def label(self) -> str:
+        """Human-readable phase name used for checkpoints and logs"""
+        return self.name.lower()
 
 class MasterWorkflow:
     def __init__(self, feature_description: str):
@@ -58,7 +63,12 @@ class MasterWorkflow:
                 saved = json.load(f)
                 self.feature = saved["feature"]
                 self.epic_id = saved["epic_id"]
-                self.state["phase"] = WorkflowPhase(saved["phase"])
+                phase = saved["phase"]
+                # State files written before phases were numeric store the name
+                self.state["phase"] = (
+                    WorkflowPhase(phase) if isinstance(phase, int)
+                    else WorkflowPhase[phase.upper()]
+                )
                 self.state["checkpoints"] = saved["checkpoints"]
                 self.state["outputs"] = saved["outputs"]
                 self.state["errors"] = saved["errors"]
@@ -79,7 +89,7 @@ class MasterWorkflow:
         while self.state["phase"] != WorkflowPhase.COMPLETE:
             current_phase = self.state["phase"]
             print(f"\n{'='*60}")
-            print(f"EXECUTING PHASE: {current_phase.value.upper()}")
+            print(f"EXECUTING PHASE: {current_phase.name}")
             print(f"{'='*60}\n")
             
             try:
@@ -87,7 +97,7 @@ class MasterWorkflow:
                 result = await phases[current_phase]()
                 
                 # Save checkpoint
-                self.state["checkpoints"][current_phase.value] = {
+                self.state["checkpoints"][current_phase.label] = {
                     "completed_at": datetime.now().isoformat(),
                     "result": result
                 }
@@ -97,9 +107,9 @@ class MasterWorkflow:
                 self.state["phase"] = self._next_phase(current_phase)
                 
             except Exception as e:
-                print(f"❌ Error in {current_phase.value}: {str(e)}")
+                print(f"❌ Error in {current_phase.label}: {str(e)}")
                 self.state["errors"].append({
-                    "phase": current_phase.value,
+                    "phase": current_phase.label,
                     "error": str(e),
                     "timestamp": datetime.now().isoformat()
                 })
@@ -304,7 +314,7 @@ class MasterWorkflow:
     async def _should_retry(self) -> bool:
         """Determine if phase should be retried"""
         error_count = len([e for e in self.state["errors"] 
-                          if e["phase"] == self.state["phase"].value])
+                          if e["phase"] == self.state["phase"].label])
         return error_count < 3
 
 
@@ -328,7 +338,7 @@ async def main():
     
     print(f"\n{'='*60}")
     print(f"WORKFLOW COMPLETE")
-    print(f"Final State: {result['phase']}")
+    print(f"Final State: {result['phase'].label}")
     print(f"Total Errors: {len(result['errors'])}")
     print(f"{'='*60}\n")
     
@@ -338,7 +348,7 @@ async def main():
     with open(report_file, 'w') as f:
         f.write(f"# Workflow Report\n\n")
         f.write(f"**Feature:** {feature}\n\n")
-        f.write(f"**Status:** {result['phase']}\n\n")
+        f.write(f"**Status:** {result['phase'].label}\n\n")
         f.write(f"## Outputs\n\n")
         for phase, output in result['outputs'].items():
             f.write(f"### {phase.title()}\n")
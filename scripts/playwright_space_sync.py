@@ -15,14 +15,16 @@ Usage:
   "Run Playwright Space sync automation"
 """
 
+import asyncio
+import functools
 import sys
 from pathlib import Path
 from datetime import datetime
-import time
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 try:
+    from playwright.async_api import async_playwright
     from playwright.sync_api import sync_playwright
 except ImportError:
     print("❌ Playwright not installed")
@@ -32,69 +34,164 @@ except ImportError:
 
 from src.utils.vector_store import VectorMemory
 
+try:
+    import pyperclip
+except ImportError:
+    pyperclip = None  # Guided sync skips the clipboard copy
+
+try:
+    from src.utils.hf_embeddings import get_hf_embedding_function
+except ImportError:
+    get_hf_embedding_function = None  # ChromaDB embeds on insert instead
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except ImportError:
+    _ENCODING = None  # Fall back to whitespace tokens
+
 SPACE_URL = "https://www.perplexity.ai/spaces/agentic-workflow-orchestration-0X7OltmBQ.2PNpcYOwuyAA"
 
+# Note: Adjust selectors based on actual Perplexity Space HTML
+MESSAGE_SELECTOR = '[data-testid="thread-message"], article'
+CONTENT_SELECTOR = '[data-testid="thread-list"], main'
+THREAD_LINK_SELECTOR = 'a[href*="/search/"]'
+CONTENT_TIMEOUT_MS = 10_000
+MAX_CONCURRENT_PAGES = 4  # Browser-tab memory budget
+CHUNK_TOKENS = 512
+CHUNK_OVERLAP = 50
+DEFAULT_BATCH_SIZE = 250
 
-def sync_perplexity_space(headless: bool = False):
-    """
-    Automated sync from Perplexity Space to ChromaDB.
+
+def chunk_text(text: str, max_tokens: int = CHUNK_TOKENS, overlap: int = CHUNK_OVERLAP):
+    """Split text into overlapping windows of at most max_tokens tokens."""
+    if _ENCODING is not None:
+        tokens, decode = _ENCODING.encode(text), _ENCODING.decode
+    else:
+        tokens, decode = text.split(), " ".join
     
-    Args:
-        headless: Run browser in headless mode (True) or visible (False)
+    step = max_tokens - overlap
+    for start in range(0, max(len(tokens) - overlap, 1), step):
+        yield decode(tokens[start:start + max_tokens])
+
+
+@functools.lru_cache(maxsize=4)
+def _memory(collection_name: str) -> VectorMemory:
+    """One VectorMemory (and ChromaDB client) per collection for the process.
+
+    Queries embed with the same model as the precomputed batch vectors.
     """
-    
-    print("🚀 PERPLEXITY SPACE → CHROMADB SYNC")
-    print("="*70)
-    print(f"Space: Agentic Workflow Orchestration")
-    print(f"URL: {SPACE_URL}")
-    print(f"Mode: {'Headless' if headless else 'Visible'}")
-    print("="*70)
-    print()
-    
-    with sync_playwright() as p:
+    return VectorMemory(collection_name=collection_name, embedding_function=_encoder())
+
+
+@functools.lru_cache(maxsize=1)
+def _encoder():
+    """Local sentence-transformer, loaded once on first batch."""
+    return get_hf_embedding_function() if get_hf_embedding_function else None
+
+
+def _save_batch(memory: VectorMemory, ids: list, docs: list, metas: list):
+    """Embed a batch off the insert path (when possible) and store it in one call."""
+    encoder = _encoder() if docs else None
+    embeddings = encoder.encode(docs) if encoder else None
+    memory.save_batch(ids, docs, metas, embeddings=embeddings)
+
+
+async def iter_messages(page):
+    """Yield the text of each thread message on the page, one at a time."""
+    for locator in await page.locator(MESSAGE_SELECTOR).all():
+        text = (await locator.inner_text()).strip()
+        if text:
+            yield text
+
+
+async def _open(page, url: str):
+    """Navigate and wait until thread content is present."""
+    await page.goto(url, wait_until="domcontentloaded")
+    await page.locator(CONTENT_SELECTOR).first.wait_for(timeout=CONTENT_TIMEOUT_MS)
+
+
+async def _fetch_thread(context, url: str, sem: asyncio.Semaphore) -> list:
+    """Open one thread in its own tab and return its message texts."""
+    async with sem:
+        page = await context.new_page()
+        try:
+            await _open(page, url)
+            return [message async for message in iter_messages(page)]
+        finally:
+            await page.close()
+
+
+async def _sync_space(headless: bool, batch_size: int, screenshot: bool):
+    """Fetch every thread of the Space concurrently and store it in ChromaDB."""
+    async with async_playwright() as p:
         # Launch browser
-        browser = p.chromium.launch(headless=headless)
-        context = browser.new_context(viewport={"width": 1920, "height": 1080})
-        page = context.new_page()
-        
-        # Navigate to Space
-        print("🔗 Opening Space...")
-        page.goto(SPACE_URL, wait_until="networkidle")
-        time.sleep(2)
-        
-        # Take screenshot for verification
-        screenshot_path = "logs/space_screenshot.png"
-        page.screenshot(path=screenshot_path)
-        print(f"📸 Screenshot saved: {screenshot_path}")
-        
-        # Get page content
-        print("📄 Extracting Space content...")
+        browser = await p.chromium.launch(headless=headless)
+        context = await browser.new_context(viewport={"width": 1920, "height": 1080})
+        page = await context.new_page()
         
-        # Get all text content from page
-        # Note: Adjust selectors based on actual Perplexity Space HTML
         try:
-            # Try to get main content
-            content = page.text_content('body')
+            # Navigate to Space
+            print("🔗 Opening Space...")
+            await _open(page, SPACE_URL)
             
-            print(f"✅ Extracted {len(content)} characters")
+            # Viewport-only JPEG is far cheaper to capture than a full-page PNG
+            if screenshot:
+                screenshot_path = "logs/space_screenshot.jpg"
+                await page.screenshot(path=screenshot_path, full_page=False, type="jpeg", quality=60)
+                print(f"📸 Screenshot saved: {screenshot_path}")
             
-            # Initialize ChromaDB
-            memory = VectorMemory(collection_name="perplexity_space")
-            
-            # Save to ChromaDB
-            key = f"space_sync_{datetime.now().timestamp()}"
-            memory.save(
-                key=key,
-                content=content,
-                metadata={
-                    "source": "perplexity_space",
-                    "space_name": "agentic-workflow-orchestration",
-                    "space_url": SPACE_URL,
-                    "synced_at": datetime.now().isoformat(),
-                    "sync_method": "playwright_automated"
-                }
+            print("📄 Extracting Space content...")
+            hrefs = await page.locator(THREAD_LINK_SELECTOR).evaluate_all(
+                "links => links.map(link => link.href)"
             )
+            thread_urls = list(dict.fromkeys(hrefs))
+            
+            if thread_urls:
+                print(f"🧵 Fetching {len(thread_urls)} threads...")
+                sem = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+                threads = await asyncio.gather(
+                    *(_fetch_thread(context, url, sem) for url in thread_urls)
+                )
+            else:
+                # No thread links: the Space page itself holds the messages
+                thread_urls = [SPACE_URL]
+                threads = [[message async for message in iter_messages(page)]]
+            
+            # Store each message (split into token windows) as its own document
+            memory = _memory("perplexity_space")
+            batch_size = min(batch_size, memory.max_batch_size)
+            synced_at = datetime.now()
+            saved = 0
+            ids, docs, metas = [], [], []
+            
+            for thread_idx, (url, messages) in enumerate(zip(thread_urls, threads)):
+                for msg_idx, message in enumerate(messages):
+                    for chunk_idx, chunk in enumerate(chunk_text(message)):
+                        ids.append(
+                            f"space_sync_{synced_at.timestamp()}_{thread_idx}_{msg_idx}_{chunk_idx}"
+                        )
+                        docs.append(chunk)
+                        metas.append({
+                            "source": "perplexity_space",
+                            "space_name": "agentic-workflow-orchestration",
+                            "space_url": SPACE_URL,
+                            "thread_url": url,
+                            "synced_at": synced_at.isoformat(),
+                            "sync_method": "playwright_automated",
+                            "message_index": msg_idx,
+                            "chunk_index": chunk_idx,
+                        })
+                        
+                        if len(ids) >= batch_size:
+                            _save_batch(memory, ids, docs, metas)
+                            saved += len(ids)
+                            ids, docs, metas = [], [], []
             
+            _save_batch(memory, ids, docs, metas)
+            saved += len(ids)
+            
+            print(f"✅ Extracted {saved} message chunks from {len(thread_urls)} threads")
             print(f"💾 Saved to ChromaDB")
             print(f"📊 Collection 'perplexity_space' now has: {memory.count()} documents")
             
@@ -105,17 +202,47 @@ def sync_perplexity_space(headless: bool = False):
             print("   2. Adjust CSS selectors for your Space")
         
         finally:
-            browser.close()
+            await browser.close()
+
+
+def sync_perplexity_space(
+    headless: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    screenshot: bool = False,
+):
+    """
+    Automated sync from Perplexity Space to ChromaDB.
+    
+    Threads are fetched concurrently in up to MAX_CONCURRENT_PAGES tabs.
+    
+    Args:
+        headless: Run browser in headless mode (True) or visible (False)
+        batch_size: Documents per ChromaDB insert call
+        screenshot: Save a screenshot of the Space page for verification
+    """
+    
+    print("🚀 PERPLEXITY SPACE → CHROMADB SYNC")
+    print("="*70)
+    print(f"Space: Agentic Workflow Orchestration")
+    print(f"URL: {SPACE_URL}")
+    print(f"Mode: {'Headless' if headless else 'Visible'}")
+    print("="*70)
+    print()
+    
+    asyncio.run(_sync_space(headless, batch_size, screenshot))
     
     print("\n" + "="*70)
     print("✅ SYNC COMPLETE")
     print("="*70)
 
 
-def manual_guided_sync():
+def manual_guided_sync(batch_size: int = DEFAULT_BATCH_SIZE):
     """
     Semi-automated sync with manual steps.
-    Opens browser for you to interact, then extracts.
+    Opens browser for you to interact, then extracts each page you visit.
+    
+    Args:
+        batch_size: Pages per ChromaDB insert call
     """
     
     print("🔄 GUIDED SYNC MODE")
@@ -127,60 +254,75 @@ def manual_guided_sync():
     print("="*70)
     print()
     
+    memory = _memory("perplexity_space")
+    batch_size = min(batch_size, memory.max_batch_size)
+    saved = 0
+    ids, docs, metas = [], [], []
+    
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=False)
         page = browser.new_page()
         
-        print("🔗 Opening Space...")
-        page.goto(SPACE_URL)
-        
-        print("\n📚 Instructions:")
-        print("1. Log in to Perplexity if prompted")
-        print("2. Browse your Space threads")
-        print("3. When ready to extract current page, press Enter...")
-        
-        input()
-        
-        # Extract current page
-        print("📄 Extracting...")
-        content = page.text_content('body')
-        title = page.title()
-        
-        print(f"✅ Extracted: {title}")
-        print(f"   Content: {len(content)} characters")
-        
-        # Copy to clipboard
-        page.evaluate(f'navigator.clipboard.writeText(`{content}`)')
-        print("📋 Copied to clipboard")
-        
-        # Save to ChromaDB
-        memory = VectorMemory(collection_name="perplexity_space")
-        key = f"space_manual_{datetime.now().timestamp()}"
-        
-        memory.save(
-            key=key,
-            content=content,
-            metadata={
-                "source": "perplexity_space",
-                "page_title": title,
-                "synced_at": datetime.now().isoformat(),
-                "sync_method": "guided"
-            }
-        )
-        
-        print(f"💾 Saved to ChromaDB")
-        
-        # Ask if want to continue
-        print("\nExtract another page? (y/n)")
-        if input().lower() == 'y':
-            print("Navigate to next page, then press Enter...")
+        try:
+            print("🔗 Opening Space...")
+            page.goto(SPACE_URL, wait_until="domcontentloaded")
+            
+            print("\n📚 Instructions:")
+            print("1. Log in to Perplexity if prompted")
+            print("2. Browse your Space threads")
+            print("3. When ready to extract current page, press Enter...")
+            
             input()
-            # Recursive call for next page
+            
+            # One browser session for every page; pages are saved in batches
+            while True:
+                print("📄 Extracting...")
+                content = page.text_content('body')
+                title = page.title()
+                
+                print(f"✅ Extracted: {title}")
+                print(f"   Content: {len(content)} characters")
+                
+                # Copy to clipboard from Python rather than round-tripping through page JS
+                if pyperclip is not None:
+                    pyperclip.copy(content)
+                    print("📋 Copied to clipboard")
+                
+                ids.append(f"space_manual_{datetime.now().timestamp()}")
+                docs.append(content)
+                metas.append({
+                    "source": "perplexity_space",
+                    "page_title": title,
+                    "synced_at": datetime.now().isoformat(),
+                    "sync_method": "guided"
+                })
+                
+                if len(ids) >= batch_size:
+                    _save_batch(memory, ids, docs, metas)
+                    saved += len(ids)
+                    ids, docs, metas = [], [], []
+                
+                print("\nExtract another page? (y/n)")
+                if input().strip().lower() != 'y':
+                    break
+                print("Navigate to next page, then press Enter...")
+                input()
         
-        browser.close()
+        finally:
+            _save_batch(memory, ids, docs, metas)
+            saved += len(ids)
+            browser.close()
+    
+    print(f"💾 Saved {saved} pages to ChromaDB")
+    print(f"📊 Collection 'perplexity_space' now has: {memory.count()} documents")
 
 
 if __name__ == "__main__":
+    # Common case: plain headless sync with defaults, no argument parsing needed
+    if len(sys.argv) == 1:
+        sync_perplexity_space(headless=True)
+        sys.exit(0)
+    
     import argparse
     
     parser = argparse.ArgumentParser(
@@ -215,11 +357,28 @@ Requirements:
         help="Show browser window (not headless)"
     )
     
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Documents per ChromaDB insert (default: {DEFAULT_BATCH_SIZE})"
+    )
+    
+    parser.add_argument(
+        "--screenshot",
+        action="store_true",
+        help="Save a screenshot of the Space page to logs/"
+    )
+    
     args = parser.parse_args()
     
     if args.guided:
-        manual_guided_sync()
+        manual_guided_sync(batch_size=args.batch_size)
     else:
-        sync_perplexity_space(headless=not args.visible)
+        sync_perplexity_space(
+            headless=not args.visible,
+            batch_size=args.batch_size,
+            screenshot=args.screenshot,
+        )
 
 
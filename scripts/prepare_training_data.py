@@ -1,7 +1,37 @@
 """Download and prepare HuggingFace training dataset."""
+import os
 import sys
 from pathlib import Path
 
+NUM_PROC = min(8, os.cpu_count() or 1)
+
+# (literal prefix, column) pairs concatenated into the "text" column
+ALPACA_TEMPLATE = [
+    ("### Instruction: ", "instruction"),
+    ("\n### Input: ", "input"),
+    ("\n### Response: ", "output"),
+]
+CODE_TEMPLATE = [
+    ("# Task: ", "instruction"),
+    ("\n", "output"),
+]
+
+
+def _format_with_arrow(dataset, template):
+    """Build a single "text" column by joining template parts with Arrow kernels."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from datasets import Dataset
+    
+    table = dataset.with_format("arrow")[:]
+    parts = []
+    for literal, column in template:
+        parts += [pa.scalar(literal), table[column]]
+    
+    text = pc.binary_join_element_wise(*parts, "", null_handling="replace")
+    return Dataset(pa.table({"text": text}))
+
+
 def prepare_dataset(dataset_name: str = "imdb", max_samples: int = 1000):
     """Download and prepare HF dataset for training.
     
@@ -21,28 +51,18 @@ def prepare_dataset(dataset_name: str = "imdb", max_samples: int = 1000):
     try:
         if dataset_name == "alpaca":
             dataset = load_dataset("tatsu-lab/alpaca", split=f"train[:{max_samples}]")
-            dataset = dataset.map(
-                lambda x: {"text": f"### Instruction: {x['instruction']}\n### Input: {x['input']}\n### Response: {x['output']}"},
-                remove_columns=dataset.column_names
-            )
+            dataset = _format_with_arrow(dataset, ALPACA_TEMPLATE)
         
         elif dataset_name == "imdb":
             dataset = load_dataset("imdb", split=f"train[:{max_samples}]")
-            dataset = dataset.map(
-                lambda x: {"text": x["text"]},
-                remove_columns=['label']
-            )
+            dataset = dataset.remove_columns(['label'])
         
         elif dataset_name == "oasst":
             dataset = load_dataset("OpenAssistant/oasst1", split=f"train[:{max_samples}]")
-            dataset = dataset.map(lambda x: {"text": x["text"]})
         
         elif dataset_name == "code":
             dataset = load_dataset("sahil2801/CodeAlpaca-20k", split=f"train[:{max_samples}]")
-            dataset = dataset.map(
-                lambda x: {"text": f"# Task: {x['instruction']}\n{x['output']}"},
-                remove_columns=dataset.column_names
-            )
+            dataset = _format_with_arrow(dataset, CODE_TEMPLATE)
         
         else:
             print(f"❌ Unknown dataset: {dataset_name}")
@@ -53,7 +73,7 @@ def prepare_dataset(dataset_name: str = "imdb", max_samples: int = 1000):
         output_path = Path("data/sample_train.jsonl")
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        dataset.to_json(output_path)
+        dataset.to_json(output_path, lines=True, batch_size=10000, num_proc=min(4, NUM_PROC))
         
         print(f"\n✅ Success!")
         print(f"   Saved {len(dataset)} examples to: {output_path}")
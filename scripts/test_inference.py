@@ -4,54 +4,83 @@ import torch
 from transformers import AutoModelForCausalLM, AutoTokenizer
 from peft import PeftModel
 
-def test_inference(model_path="models/finetuned_gpt2", prompt="This movie was"):
-    """Load LoRA model and generate text."""
-    
+DEFAULT_PROMPTS = [
+    "This movie was",
+    "The acting in this film",
+    "I really enjoyed",
+]
+
+
+def load_model(model_path="models/finetuned_gpt2"):
+    """Load base model and LoRA adapter once; returns (model, tokenizer)."""
+    print("Loading base GPT-2 model...")
+    base_model = AutoModelForCausalLM.from_pretrained("gpt2", device_map="mps", torch_dtype=torch.float16)
+    tokenizer = AutoTokenizer.from_pretrained("gpt2")
+    tokenizer.pad_token = tokenizer.eos_token
+    tokenizer.padding_side = "left"  # Decoder-only models continue from the right edge
+
+    print(f"Loading LoRA adapter from {model_path}...")
+    model = PeftModel.from_pretrained(base_model, model_path)
+    # Fold the LoRA deltas into the base weights: one matmul per layer instead of three
+    model = model.merge_and_unload()
+    model.eval()
+    model.config.use_cache = True  # Training disables the KV cache; inference wants it
+
+    return model, tokenizer
+
+
+def run_prompts(model, tokenizer, prompts):
+    """
+    Generate completions for all prompts in a single batched generate call.
+
+    Returns (texts, new_tokens), where new_tokens counts the generated
+    positions shared by the whole batch.
+    """
+    inputs = tokenizer(prompts, return_tensors="pt", padding=True).to("mps")
+
+    with torch.inference_mode():
+        outputs = model.generate(
+            **inputs,
+            max_new_tokens=50,
+            temperature=0.7,
+            do_sample=True,
+            top_p=0.9,
+            use_cache=True,
+            pad_token_id=tokenizer.eos_token_id
+        )
+
+    new_tokens = outputs.shape[-1] - inputs["input_ids"].shape[-1]
+    return tokenizer.batch_decode(outputs, skip_special_tokens=True), new_tokens
+
+
+def test_inference(model_path="models/finetuned_gpt2", prompts=DEFAULT_PROMPTS):
+    """Load LoRA model once and generate text for every prompt."""
+
     print("="*60)
     print("Testing LoRA Model Inference")
     print("="*60)
     print(f"Model: {model_path}")
-    print(f"Prompt: {prompt}")
+    print(f"Prompts: {len(prompts)}")
     print("="*60)
-    
+
     try:
-        # Load base model
-        print("Loading base GPT-2 model...")
-        base_model = AutoModelForCausalLM.from_pretrained("gpt2", device_map="mps", torch_dtype=torch.float16)
-        tokenizer = AutoTokenizer.from_pretrained("gpt2")
-        
-        # Load LoRA adapter
-        print(f"Loading LoRA adapter from {model_path}...")
-        model = PeftModel.from_pretrained(base_model, model_path)
-        model.eval()
-        
-        # Generate text
+        model, tokenizer = load_model(model_path)
+
         print("\nGenerating text...")
-        inputs = tokenizer(prompt, return_tensors="pt").to("mps")
-        
-        with torch.no_grad():
-            outputs = model.generate(
-                **inputs,
-                max_new_tokens=50,
-                temperature=0.7,
-                do_sample=True,
-                top_p=0.9,
-                pad_token_id=tokenizer.eos_token_id
-            )
-        
-        generated_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
-        
-        print("\n" + "="*60)
-        print("GENERATED TEXT:")
-        print("="*60)
-        print(generated_text)
-        print("="*60)
-        
+        texts, new_tokens = run_prompts(model, tokenizer, prompts)
+
+        for prompt, generated_text in zip(prompts, texts):
+            print("\n" + "="*60)
+            print(f"PROMPT: {prompt}")
+            print("="*60)
+            print(generated_text)
+            print("="*60)
+
         print("\n✅ Inference test passed!")
-        print(f"   Generated {len(outputs[0]) - len(inputs['input_ids'][0])} new tokens")
-        
-        return {"status": "success", "text": generated_text}
-        
+        print(f"   Generated {new_tokens} new tokens for {len(prompts)} prompts in one batch")
+
+        return {"status": "success", "texts": texts}
+
     except Exception as e:
         print(f"\n❌ Inference failed: {e}")
         import traceback
@@ -60,17 +89,9 @@ def test_inference(model_path="models/finetuned_gpt2", prompt="This movie was"):
 
 
 if __name__ == "__main__":
-    # Test with multiple prompts
-    prompts = [
-        "This movie was",
-        "The acting in this film",
-        "I really enjoyed",
-    ]
-    
-    for prompt in prompts:
-        print("\n")
-        result = test_inference(prompt=prompt)
-        if result["status"] != "success":
-            exit(1)
-        print("\n" + "-"*60)
+    import sys
 
+    # Prompts from the command line (or the defaults) share one batched generate
+    result = test_inference(prompts=sys.argv[1:] or DEFAULT_PROMPTS)
+    if result["status"] != "success":
+        exit(1)
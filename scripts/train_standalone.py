@@ -4,7 +4,9 @@ Runs LoRA fine-tuning with profiling, MLflow tracking, and GPU coordination.
 Bypasses CrewAI imports for Python 3.9 compatibility.
 """
 
+import importlib.util
 import logging
+import os
 import torch
 from pathlib import Path
 import mlflow
@@ -13,9 +15,10 @@ from transformers import (
     AutoTokenizer,
     TrainingArguments,
     Trainer,
+    TrainerCallback,
     DataCollatorForLanguageModeling,
 )
-from peft import LoraConfig, get_peft_model, TaskType, prepare_model_for_kbit_training
+from peft import LoraConfig, get_peft_model, TaskType
 from datasets import load_dataset
 from torchinfo import summary
 
@@ -23,12 +26,31 @@ from torchinfo import summary
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 8-bit AdamW quarters optimizer-state memory; bitsandbytes' kernels need CUDA
+OPTIMIZER = (
+    "adamw_bnb_8bit"
+    if torch.cuda.is_available() and importlib.util.find_spec("bitsandbytes")
+    else "adamw_torch"
+)
+
+
+class ProfilerStepCallback(TrainerCallback):
+    """Advance the torch profiler schedule once per training step."""
+    
+    def __init__(self, prof):
+        self.prof = prof
+    
+    def on_step_end(self, args, state, control, **kwargs):
+        self.prof.step()
+
+
 def train_with_profiling(
     model_name: str = "gpt2",  # Using GPT-2 for testing (ungated, 124M params)
     dataset_path: str = "data/sample_train.jsonl",
     output_dir: str = "models/finetuned_gpt2",
     max_steps: int = 50,
-    profile_steps: int = 10,
+    profile_steps: int = 3,
+    with_stack: bool = False,
 ):
     """Train model with LoRA and profiling."""
     
@@ -60,8 +82,7 @@ def train_with_profiling(
             model = AutoModelForCausalLM.from_pretrained(
                 model_name,
                 device_map="mps",
-                torch_dtype=torch.float16,
-                use_cache=False,
+                torch_dtype=torch.bfloat16,  # No fp16 loss-scaling overflow on MPS
             )
             tokenizer = AutoTokenizer.from_pretrained(model_name)
             
@@ -79,7 +100,11 @@ def train_with_profiling(
                 task_type=TaskType.CAUSAL_LM,
             )
             
-            model = prepare_model_for_kbit_training(model)
+            # Recompute activations in backward: less peak memory, larger batches.
+            # Not prepare_model_for_kbit_training: the model isn't quantized, and
+            # that call would upcast the bf16 weights back to fp32.
+            model.gradient_checkpointing_enable(gradient_checkpointing_kwargs={"use_reentrant": False})
+            model.enable_input_require_grads()  # Checkpointed inputs need grads under frozen weights
             model = get_peft_model(model, lora_config)
             
             logger.info("LoRA applied to model")
@@ -93,35 +118,45 @@ def train_with_profiling(
             logger.info(f"Loading dataset: {dataset_path}")
             dataset = load_dataset("json", data_files=dataset_path)
             
+            # No padding here: the collator pads each batch to its longest sequence
             def tokenize_function(examples):
                 return tokenizer(
                     examples["text"],
                     truncation=True,
                     max_length=512,
-                    padding="max_length",
                 )
             
-            tokenized = dataset.map(tokenize_function, batched=True, remove_columns=dataset["train"].column_names)
+            tokenized = dataset.map(
+                tokenize_function,
+                batched=True,
+                batch_size=1000,
+                num_proc=min(8, os.cpu_count() or 1),
+                remove_columns=dataset["train"].column_names,
+            )
             logger.info(f"Dataset tokenized: {len(tokenized['train'])} examples")
             
             # Training args (MPS-compatible)
             training_args = TrainingArguments(
                 output_dir=output_dir,
                 max_steps=max_steps,
-                per_device_train_batch_size=2,  # Smaller for GPT-2
-                gradient_accumulation_steps=2,
+                per_device_train_batch_size=4,  # Fits with gradient checkpointing
+                gradient_accumulation_steps=1,
                 learning_rate=2e-4,
-                # fp16=False,  # MPS doesn't support fp16 in transformers
+                bf16=True,
                 logging_steps=10,
                 save_steps=50,
                 report_to="mlflow",
                 dataloader_num_workers=4,  # Reduced for stability
                 warmup_steps=5,
                 max_grad_norm=1.0,
-                optim="adamw_torch",
+                optim=OPTIMIZER,
             )
             
-            data_collator = DataCollatorForLanguageModeling(tokenizer=tokenizer, mlm=False)
+            data_collator = DataCollatorForLanguageModeling(
+                tokenizer=tokenizer,
+                mlm=False,
+                pad_to_multiple_of=8,  # Aligned batch shapes for MPS
+            )
             
             trainer = Trainer(
                 model=model,
@@ -137,14 +172,15 @@ def train_with_profiling(
                 activities=[
                     torch.profiler.ProfilerActivity.CPU,  # MPS profiling not available in this PyTorch version
                 ],
-                schedule=torch.profiler.schedule(wait=1, warmup=1, active=profile_steps, repeat=1),
+                # Skip startup steps, then trace a short window of steady-state steps
+                schedule=torch.profiler.schedule(wait=5, warmup=1, active=profile_steps, repeat=1),
                 on_trace_ready=torch.profiler.tensorboard_trace_handler("logs/profiling"),
                 record_shapes=True,
                 profile_memory=True,
-                with_stack=True,
+                with_stack=with_stack,  # Python stacks roughly triple per-op overhead
             ) as prof:
+                trainer.add_callback(ProfilerStepCallback(prof))
                 train_output = trainer.train()
-                prof.step()
             
             logger.info("Training complete!")
             
@@ -189,7 +225,17 @@ def train_with_profiling(
 
 
 if __name__ == "__main__":
-    result = train_with_profiling()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="LoRA training with profiling")
+    parser.add_argument(
+        "--with-stack",
+        action="store_true",
+        help="Record Python stacks in the profiler trace (slow)"
+    )
+    args = parser.parse_args()
+    
+    result = train_with_profiling(with_stack=args.with_stack)
     if result["status"] != "success":
         exit(1)
 
@@ -1,6 +1,6 @@
 """Architect Agent - System architecture design for CrewAI"""
 from crewai import Agent
-from config import MODEL_BACKEND, get_llm_backend
+from config import MODEL_BACKEND, get_shared_llm_backend
 from src.tools.production_tools import (
     read_file,
     list_directory,
@@ -9,7 +9,7 @@ from src.tools.production_tools import (
 
 class ArchitectAgent:
     def __init__(self):
-        self.llm = get_llm_backend()
+        self.llm = get_shared_llm_backend()
         self.tools = [read_file, list_directory, get_current_date]
 
     def create(self) -> Agent:
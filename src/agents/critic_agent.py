@@ -1,6 +1,6 @@
 """Critic Agent - Code review and quality assessment"""
 from crewai import Agent
-from config import get_llm_backend
+from config import get_shared_llm_backend
 from src.tools.production_tools import (
     read_file,
     test_code,
@@ -10,7 +10,7 @@ from src.tools.production_tools import (
 
 class CriticAgent:
     def __init__(self):
-        self.llm = get_llm_backend()
+        self.llm = get_shared_llm_backend()
         self.tools = [read_file, test_code, validate_python_code, list_directory]
 
     def create(self) -> Agent:
@@ -1,6 +1,6 @@
 """DevOps Agent - Infrastructure and Deployment"""
 from crewai import Agent
-from config import get_llm_backend
+from config import get_shared_llm_backend
 from src.tools.production_tools import (
     create_project_structure,
     generate_requirements,
@@ -9,7 +9,7 @@ from src.tools.production_tools import (
 
 class DevOpsAgent:
     def __init__(self):
-        self.llm = get_llm_backend()
+        self.llm = get_shared_llm_backend()
         self.tools = [create_project_structure, generate_requirements, write_file]
 
     def create(self) -> Agent:
@@ -1,6 +1,6 @@
 """Docs Agent - Technical Documentation"""
 from crewai import Agent
-from config import get_llm_backend
+from config import get_shared_llm_backend
 from src.tools.production_tools import (
     write_file,
     read_file,
@@ -9,7 +9,7 @@ from src.tools.production_tools import (
 
 class DocsAgent:
     def __init__(self):
-        self.llm = get_llm_backend()
+        self.llm = get_shared_llm_backend()
         self.tools = [write_file, read_file, get_current_date]
 
     def create(self) -> Agent:
@@ -1,6 +1,6 @@
 """Full-Stack Agent - Implementation for CrewAI"""
 from crewai import Agent
-from config import get_llm_backend
+from config import get_shared_llm_backend
 from src.tools.production_tools import (
     write_file,
     read_file,
@@ -10,7 +10,7 @@ from src.tools.production_tools import (
 
 class FullStackAgent:
     def __init__(self):
-        self.llm = get_llm_backend()
+        self.llm = get_shared_llm_backend()
         self.tools = [write_file, read_file, validate_python_code, create_project_files]
 
     def create(self) -> Agent:
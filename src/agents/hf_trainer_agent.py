@@ -1,22 +1,115 @@
 """HuggingFace Trainer Agent - LoRA fine-tuning with MCP profiling"""
+import dataclasses
+import hashlib
 import logging
+import os
 import torch
+from itertools import chain, count
 from typing import Dict, Any, Optional
 from pathlib import Path
 
 from crewai import Agent
-from config import get_llm_backend
+from config import get_shared_llm_backend
 from src.utils.gpu_manager import get_gpu_manager
 
+# Training stack is optional: resolved once at import, checked per call
+try:
+    import mlflow
+    from transformers import (
+        AutoModelForCausalLM,
+        AutoTokenizer,
+        TrainingArguments,
+        Trainer,
+        TrainerCallback,
+        default_data_collator,
+    )
+    from peft import LoraConfig, get_peft_model, TaskType
+    from datasets import load_dataset
+    from src.mcp import ProfilingAnalyzer
+    TRAINING_AVAILABLE = True
+except ImportError:
+    TRAINING_AVAILABLE = False
+    TrainerCallback = object  # Keeps ProfileWindowCallback importable
+
 logger = logging.getLogger(__name__)
 
+# Packed training sequence length (tokens)
+BLOCK_SIZE = 512
+
+
+def _apply_checkpoint_interval(model, interval: int):
+    """Checkpoint only every ``interval``-th layer call instead of every layer.
+
+    ``gradient_checkpointing_enable`` installs a ``_gradient_checkpointing_func``
+    on each checkpointable module; wrap it so the remaining calls run as a plain
+    forward and keep their activations (less recompute, more memory).
+    """
+    if interval <= 1:
+        return
+    calls = count()
+    for module in model.modules():
+        checkpoint_fn = getattr(module, "_gradient_checkpointing_func", None)
+        if checkpoint_fn is None:
+            continue
+
+        def every_nth(func, *args, _checkpoint=checkpoint_fn, **kwargs):
+            if next(calls) % interval == 0:
+                return _checkpoint(func, *args, **kwargs)
+            return func(*args, **kwargs)
+
+        module._gradient_checkpointing_func = every_nth
+
+
+def _tune_dataloader_workers(findings: Dict[str, Any], workers: int) -> int:
+    """Suggest dataloader_num_workers for the next run from profiler findings.
+
+    Doubles the worker count (up to the CPU count) when the DataLoader shows up
+    as a significant bottleneck, and halves it when it does not appear at all.
+    """
+    loader = next(
+        (b for b in findings.get("bottlenecks", []) if b.get("operation") == "DataLoader"),
+        None,
+    )
+    if loader is None:
+        return max(1, workers // 2) if workers else 0
+    if loader.get("percentage", 0) > 10:
+        return min(os.cpu_count() or workers, workers * 2)
+    return workers
+
+
+class ProfileWindowCallback(TrainerCallback):
+    """Step the profiler for its scheduled window, then stop it.
+
+    Later steps train with no profiler attached at all.
+    """
+
+    def __init__(self, prof, num_steps):
+        self.prof = prof
+        self.remaining = num_steps
+
+    def _stop(self):
+        if self.prof is not None:
+            self.prof.stop()
+            self.prof = None
+
+    def on_step_end(self, args, state, control, **kwargs):
+        if self.prof is None:
+            return
+        self.prof.step()
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self._stop()
+
+    def on_train_end(self, args, state, control, **kwargs):
+        self._stop()
+
 
 class HFTrainerAgent:
     """Agent for HuggingFace model training with integrated MCP profiling."""
 
     def __init__(self):
         """Initialize HF Trainer agent."""
-        self.llm = get_llm_backend()
+        self.llm = get_shared_llm_backend()
         self.tools = []  # Training is compute-heavy, not a CrewAI tool
 
     def create(self) -> Agent:
@@ -41,6 +134,12 @@ class HFTrainerAgent:
         hf_repo: Optional[str] = None,
         max_steps: int = 100,
         profile_steps: int = 10,
+        gradient_checkpointing_interval: int = 1,
+        dataloader_num_workers: int = 4,
+        record_shapes: bool = False,
+        profile_memory: bool = False,
+        deep_profile: bool = False,
+        log_model_summary: bool = False,
     ) -> Dict[str, Any]:
         """Train model with LoRA and integrated MCP profiling.
 
@@ -51,23 +150,34 @@ class HFTrainerAgent:
             hf_repo: Optional HF repo to upload (e.g., "username/model-name")
             max_steps: Maximum training steps
             profile_steps: Number of steps to profile
+            gradient_checkpointing_interval: Checkpoint every n-th decoder layer
+                (1 = every layer, lowest memory; ~sqrt(num_layers) trades some
+                memory back for less recompute)
+            dataloader_num_workers: DataLoader worker processes. The result's
+                suggested_dataloader_workers feeds the next run.
+            record_shapes: Record operator input shapes in the profiler trace
+            profile_memory: Track tensor allocations in the profiler trace
+            deep_profile: Also record Python stacks (slowest profiler mode)
+            log_model_summary: Log a torchinfo module summary to MLflow
 
         Returns:
-            Dict with model_path, hf_repo, profiling_report, loss
+            Dict with model_path, hf_repo, profiling_report (file path), loss
         """
         try:
-            import mlflow
-            from transformers import (
-                AutoModelForCausalLM,
-                AutoTokenizer,
-                TrainingArguments,
-                Trainer,
-                DataCollatorForLanguageModeling,
-            )
-            from peft import LoraConfig, get_peft_model, TaskType, prepare_model_for_kbit_training
-            from datasets import load_dataset
-            from torchinfo import summary
-            from src.mcp import ProfilingAnalyzer
+            if not TRAINING_AVAILABLE:
+                raise RuntimeError(
+                    "Training dependencies not installed. "
+                    "Install with: pip install mlflow transformers peft datasets"
+                )
+
+            # bf16 autocast on MPS needs torch>=2.6; fp16 GradScaler on MPS
+            # silently falls back to fp32 or errors out, so never use it there
+            device = "mps" if torch.backends.mps.is_available() else "cpu"
+            if device == "mps" and tuple(int(p) for p in torch.__version__.split(".")[:2]) < (2, 6):
+                raise RuntimeError(
+                    f"bf16 training on MPS requires torch>=2.6 (found {torch.__version__})"
+                )
+            use_bf16 = device == "mps"
 
             # Start MLflow experiment tracking
             mlflow.set_experiment("unified_orchestrator_training")
@@ -77,10 +187,12 @@ class HFTrainerAgent:
                 params = {
                     "base_model": model_name,
                     "max_steps": max_steps,
-                    "device": "mps",
+                    "device": device,
+                    "precision": "bf16" if use_bf16 else "fp32",
                     "lora_r": 16,
                     "lora_alpha": 32,
                     "profile_steps": profile_steps,
+                    "gradient_checkpointing_interval": gradient_checkpointing_interval,
                 }
                 mlflow.log_params(params)
                 logger.info(f"Training parameters: {params}")
@@ -93,8 +205,8 @@ class HFTrainerAgent:
                     logger.info(f"Loading model: {model_name}")
                     model = AutoModelForCausalLM.from_pretrained(
                         model_name,
-                        device_map="mps",
-                        torch_dtype=torch.float16,
+                        device_map=device,
+                        torch_dtype=torch.bfloat16 if use_bf16 else torch.float32,
                         use_cache=False,  # Required for gradient checkpointing
                     )
                     tokenizer = AutoTokenizer.from_pretrained(model_name)
@@ -108,23 +220,45 @@ class HFTrainerAgent:
                 lora_config = LoraConfig(
                     r=16,
                     lora_alpha=32,
-                    target_modules=["q_proj", "v_proj"],
+                    # Every attention and MLP projection: more work per adapter
+                    # call, still <1% extra params
+                    target_modules=[
+                        "q_proj", "k_proj", "v_proj", "o_proj",
+                        "gate_proj", "up_proj", "down_proj",
+                    ],
                     lora_dropout=0.05,
                     bias="none",
                     task_type=TaskType.CAUSAL_LM,
                 )
 
-                # Prepare and apply LoRA
-                model = prepare_model_for_kbit_training(model)
+                # No k-bit quantization here: prepare_model_for_kbit_training would
+                # only upcast embeddings/norms to fp32. Just keep gradients flowing
+                # from the embeddings for checkpointing + LoRA.
+                model.enable_input_require_grads()
+                # Base weights are frozen here, so autograd already skips their
+                # grad_weight GEMMs. grad_input through the frozen W.x path is
+                # still required: it carries gradients to the adapters of
+                # earlier layers, so that branch must not run under no_grad.
                 model = get_peft_model(model, lora_config)
+
+                # Recompute activations in backward: less peak memory, larger batches
+                model.gradient_checkpointing_enable(
+                    gradient_checkpointing_kwargs={"use_reentrant": False}
+                )
+                _apply_checkpoint_interval(model, gradient_checkpointing_interval)
                 
                 logger.info(f"LoRA applied to model")
                 model.print_trainable_parameters()
 
-                # Model architecture summary (MCP Tool)
-                model_summary_str = str(summary(model, verbose=0))
-                logger.info(f"Model architecture summary generated")
-                mlflow.log_text(model_summary_str, "model_architecture.txt")
+                # Model architecture summary (MCP Tool): walks every submodule of
+                # the wrapped model, so only on request
+                if log_model_summary:
+                    from torchinfo import summary
+
+                    # No input_size: parameter table only, no dummy forward pass
+                    model_summary_str = str(summary(model, verbose=0))
+                    logger.info(f"Model architecture summary generated")
+                    mlflow.log_text(model_summary_str, "model_architecture.txt")
 
                 # Load and tokenize dataset
                 logger.info(f"Loading dataset from {dataset_path}")
@@ -135,23 +269,77 @@ class HFTrainerAgent:
                 else:
                     raise ValueError(f"Unsupported format: {dataset_path}")
 
-                def tokenize_function(examples):
-                    """Tokenize text examples."""
-                    return tokenizer(
-                        examples.get("text", examples.get("content", "")),
-                        truncation=True,
-                        max_length=512,
-                        padding="max_length",
+                # Resolve the text column once instead of probing every batch
+                columns = dataset["train"].column_names
+                if "text" in columns:
+                    text_column = "text"
+                elif "content" in columns:
+                    text_column = "content"
+                else:
+                    raise ValueError(
+                        f"Dataset needs a 'text' or 'content' column, found: {columns}"
                     )
 
+                def tokenize_function(examples):
+                    """Tokenize text examples (no padding; packed below)."""
+                    return tokenizer(examples[text_column])
+
+                def group_texts(examples):
+                    """Pack token streams into contiguous BLOCK_SIZE-token blocks."""
+                    concatenated = {k: list(chain.from_iterable(examples[k])) for k in examples.keys()}
+                    total = (len(concatenated["input_ids"]) // BLOCK_SIZE) * BLOCK_SIZE
+                    result = {
+                        k: [t[i:i + BLOCK_SIZE] for i in range(0, total, BLOCK_SIZE)]
+                        for k, t in concatenated.items()
+                    }
+                    result["labels"] = result["input_ids"].copy()
+                    return result
+
+                # Cache both passes next to the source, keyed on everything that
+                # changes their output, so unchanged data is memory-mapped back
+                # instead of re-tokenized
+                src_stat = os.stat(dataset_path)
+                cache_key = hashlib.sha256(
+                    f"{tokenizer.name_or_path}:{BLOCK_SIZE}:"
+                    f"{src_stat.st_mtime_ns}:{src_stat.st_size}".encode()
+                ).hexdigest()[:16]
+                num_proc = max(1, (os.cpu_count() or 2) // 2)
+
                 tokenized_dataset = dataset.map(
                     tokenize_function,
                     batched=True,
-                    remove_columns=dataset["train"].column_names,
+                    num_proc=num_proc,
+                    remove_columns=columns,
+                    load_from_cache_file=True,
+                    cache_file_names={
+                        split: f"{dataset_path}.{cache_key}.{split}.tok.arrow" for split in dataset
+                    },
+                )
+                # Packing removes PAD tokens entirely, so no attention or
+                # activation memory is spent on padding
+                tokenized_dataset = tokenized_dataset.map(
+                    group_texts,
+                    batched=True,
+                    num_proc=num_proc,
+                    load_from_cache_file=True,
+                    cache_file_names={
+                        split: f"{dataset_path}.{cache_key}.{split}.packed.arrow" for split in dataset
+                    },
                 )
                 
                 logger.info(f"Dataset tokenized: {len(tokenized_dataset['train'])} examples")
 
+                # Worker reuse/prefetch options only exist on newer Transformers
+                arg_fields = {f.name for f in dataclasses.fields(TrainingArguments)}
+                loader_kwargs = {
+                    k: v
+                    for k, v in (
+                        ("dataloader_persistent_workers", True),
+                        ("dataloader_prefetch_factor", 4),
+                    )
+                    if k in arg_fields and dataloader_num_workers > 0
+                }
+
                 # Training arguments (M3 Max optimized)
                 training_args = TrainingArguments(
                     output_dir=output_dir,
@@ -159,23 +347,25 @@ class HFTrainerAgent:
                     per_device_train_batch_size=4,
                     gradient_accumulation_steps=4,
                     learning_rate=2e-4,
-                    fp16=True,  # Mixed precision for M3 Max
+                    fp16=False,
+                    bf16=use_bf16,  # Mixed precision for M3 Max
                     logging_steps=10,
                     save_steps=50,
                     report_to="mlflow",
-                    # M3 Max specific optimizations
-                    dataloader_num_workers=8,  # 16-core CPU
-                    dataloader_pin_memory=True,
+                    # M3 Max specific optimizations: data is pre-tokenized, so a
+                    # few persistent workers suffice; pinned memory is CUDA-only
+                    dataloader_num_workers=dataloader_num_workers,
+                    dataloader_pin_memory=False,
+                    **loader_kwargs,
                     warmup_steps=10,
                     max_grad_norm=1.0,
-                    optim="adamw_torch",  # Faster than adamw_hf on MPS
+                    # One fused kernel for all parameter updates (MPS support
+                    # is guaranteed by the torch>=2.6 check above)
+                    optim="adamw_torch_fused" if device == "mps" else "adamw_torch",
                 )
 
-                # Data collator
-                data_collator = DataCollatorForLanguageModeling(
-                    tokenizer=tokenizer,
-                    mlm=False,  # Causal LM
-                )
+                # Packed blocks are equal length and carry their own labels
+                data_collator = default_data_collator
 
                 # Create trainer
                 trainer = Trainer(
@@ -188,34 +378,44 @@ class HFTrainerAgent:
                 # MCP PROFILING INTEGRATION
                 logger.info(f"Starting training with profiling ({profile_steps} steps)...")
                 
-                with torch.profiler.profile(
+                wait, warmup = 1, 1
+                prof = torch.profiler.profile(
                     activities=[
                         torch.profiler.ProfilerActivity.CPU,
                         torch.profiler.ProfilerActivity.MPS,  # M3 Max GPU
                     ],
                     schedule=torch.profiler.schedule(
-                        wait=1,
-                        warmup=1,
+                        wait=wait,
+                        warmup=warmup,
                         active=profile_steps,
                         repeat=1,
                     ),
                     on_trace_ready=torch.profiler.tensorboard_trace_handler("logs/profiling"),
-                    record_shapes=True,
-                    profile_memory=True,
-                    with_stack=True,
-                ) as prof:
-                    # Train with profiling
-                    train_output = trainer.train()
-                    prof.step()  # Advance profiler
+                    # Shapes, memory and stacks dominate profiler overhead: opt-in only
+                    record_shapes=record_shapes,
+                    profile_memory=profile_memory,
+                    with_stack=deep_profile,
+                )
+                # Profile only the first wait+warmup+active steps of the run
+                trainer.add_callback(
+                    ProfileWindowCallback(prof, wait + warmup + profile_steps)
+                )
+                prof.start()
+                train_output = trainer.train()
 
                 logger.info("Training complete!")
 
-                # Save profiling report
-                prof_report = prof.key_averages().table(
-                    sort_by="self_mps_time_total", row_limit=20
-                )
-                logger.info(f"Profiling report:\n{prof_report}")
-                mlflow.log_text(prof_report, "profiling_report.txt")
+                # Write the top-20 op table straight to disk and attach it to the run
+                prof_report = Path("logs/profiling") / "profiling_report.txt"
+                prof_report.parent.mkdir(parents=True, exist_ok=True)
+                with open(prof_report, "w") as f:
+                    f.write(
+                        prof.key_averages(group_by_input_shape=False).table(
+                            sort_by="self_mps_time_total", row_limit=20
+                        )
+                    )
+                logger.info(f"Profiling report written to {prof_report}")
+                mlflow.log_artifact(str(prof_report))
 
                 # Log training metrics
                 metrics = {
@@ -235,6 +435,12 @@ class HFTrainerAgent:
                 for rec in findings["recommendations"]:
                     logger.info(f"  [{rec['priority']}] {rec['action']}")
 
+                suggested_workers = _tune_dataloader_workers(findings, dataloader_num_workers)
+                if suggested_workers != dataloader_num_workers:
+                    logger.info(
+                        f"Suggest dataloader_num_workers={suggested_workers} for the next run"
+                    )
+
                 # Save model
                 output_path = Path(output_dir)
                 output_path.mkdir(parents=True, exist_ok=True)
@@ -253,11 +459,20 @@ class HFTrainerAgent:
                     except Exception as e:
                         logger.warning(f"Repo creation: {e}")
                     
-                    api.upload_folder(
-                        folder_path=output_dir,
-                        repo_id=hf_repo,
-                        repo_type="model",
-                    )
+                    # Parallel, resumable multi-commit upload on newer huggingface_hub
+                    if hasattr(api, "upload_large_folder"):
+                        api.upload_large_folder(
+                            folder_path=output_dir,
+                            repo_id=hf_repo,
+                            repo_type="model",
+                            num_workers=8,
+                        )
+                    else:
+                        api.upload_folder(
+                            folder_path=output_dir,
+                            repo_id=hf_repo,
+                            repo_type="model",
+                        )
                     logger.info(f"✅ Model uploaded to HF Pro: {hf_repo}")
                     mlflow.log_param("hf_repo", hf_repo)
 
@@ -267,10 +482,11 @@ class HFTrainerAgent:
                     "status": "success",
                     "model_path": output_dir,
                     "hf_repo": hf_repo,
-                    "profiling_report": prof_report,
+                    "profiling_report": str(prof_report),
                     "loss": train_output.training_loss,
                     "metrics": metrics,
                     "mcp_findings": findings,
+                    "suggested_dataloader_workers": suggested_workers,
                 }
 
         except Exception as e:
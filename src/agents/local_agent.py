@@ -1,12 +1,33 @@
 """Local Agent - Ollama-based local LLM agent"""
-import subprocess
+import httpx
 
 class LocalAgent:
-    def __init__(self, model: str):
+    def __init__(
+        self,
+        model: str,
+        base_url: str = "http://localhost:11434",
+        keep_alive: str = "10m",
+    ):
         self.model = model
+        self.keep_alive = keep_alive  # Keep the model loaded between calls
+        # One persistent connection to the Ollama daemon instead of a process per call
+        self._client = httpx.Client(base_url=base_url.rstrip('/'), timeout=None)
 
     def ask(self, prompt: str) -> str:
         """Query local Ollama model"""
-        cmd = ["ollama", "run", self.model, prompt]
-        proc = subprocess.run(cmd, capture_output=True, text=True)
-        return proc.stdout.strip()
+        response = self._client.post(
+            "/api/generate",
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": False,
+                "keep_alive": self.keep_alive,
+            },
+        )
+        response.raise_for_status()
+        return response.json()["response"].strip()
+
+    def __del__(self):
+        """Cleanup HTTP client"""
+        if hasattr(self, '_client'):
+            self._client.close()
@@ -1,7 +1,7 @@
 """QA Agent - Testing and Quality Assurance"""
 from crewai import Agent
 from pathlib import Path
-from config import get_llm_backend
+from config import get_shared_llm_backend
 from src.tools.production_tools import (
     test_code,
     read_file,
@@ -10,7 +10,7 @@ from src.tools.production_tools import (
 
 class QAAgent:
     def __init__(self):
-        self.llm = get_llm_backend()
+        self.llm = get_shared_llm_backend()
         self.tools = [test_code, read_file, validate_python_code]
 
     def create(self) -> Agent:
@@ -3,22 +3,35 @@
 Command-line interface using Typer for running jobs and inspecting results.
 """
 
+import heapq
 import json
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Iterator, Optional
 
 import typer
-import yaml
 from rich import print as rprint
 from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
 
-from src.core.models import JobSpec
-from src.orchestrator.dag_orchestrator import run_orchestrator
-from src.core.events import read_events, filter_events
-from src.core.manifest import RunManager
+from src.core.events import (
+    count_events,
+    filter_events,
+    iter_events,
+    prefilter_needles,
+    read_events_head,
+)
+
+# yaml, the orchestrator (and its providers) and rich's Table/Panel are
+# imported inside the commands that use them, so e.g. `list-runs` and
+# `tail` don't pay for `run`'s dependencies at startup.
+
+try:
+    from orjson import loads as _json_loads  # Faster C decoder when installed
+except ImportError:
+    _json_loads = json.loads
 
 app = typer.Typer(
     name="orchestrator",
@@ -28,82 +41,119 @@ app = typer.Typer(
 console = Console()
 
 
+_EMPTY: Dict[str, Any] = {}
+
+# Enough to overlap small-file reads without oversubscribing slow/network disks
+_MANIFEST_READ_WORKERS = 8
+
+
+@lru_cache(maxsize=128)
+def _load_manifest_cached(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a manifest; mtime_ns is part of the cache key so rewrites invalidate it."""
+    with open(path, "rb") as f:
+        return _json_loads(f.read())
+
+
+def _load_manifest(run_dir: Path) -> Optional[Dict[str, Any]]:
+    """Read a run's manifest.json (memoized per mtime), or None if the run has none.
+
+    The returned dict may be shared between callers: treat it as read-only.
+    """
+    manifest_path = run_dir / "manifest.json"
+    try:
+        mtime_ns = os.stat(manifest_path).st_mtime_ns
+        return _load_manifest_cached(str(manifest_path), mtime_ns)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _new_step_summary(step_id: str, first_ts: Optional[str]) -> Dict[str, Any]:
+    return {
+        "step": step_id,
+        "status": "pending",
+        "started_ts": None,
+        "finished_ts": None,
+        "duration_s": None,
+        "provider_calls": 0,
+        "message": "",
+        "first_ts": first_ts,
+    }
+
+
+def _on_step_started(entry: Dict[str, Any], event: dict, ts: Optional[str], data: dict):
+    entry["status"] = "running"
+    entry["started_ts"] = ts
+
+
+def _on_step_succeeded(entry: Dict[str, Any], event: dict, ts: Optional[str], data: dict):
+    entry["status"] = "succeeded"
+    entry["finished_ts"] = ts
+    entry["duration_s"] = event.get("duration_s") or data.get("duration_s")
+    entry["provider_calls"] = event.get("provider_calls") or data.get("provider_calls", 0)
+
+
+def _on_step_failed(entry: Dict[str, Any], event: dict, ts: Optional[str], data: dict):
+    entry["status"] = "failed"
+    entry["finished_ts"] = ts
+    entry["message"] = event.get("message") or data.get("message", "")
+
+
+def _on_step_cancelled(entry: Dict[str, Any], event: dict, ts: Optional[str], data: dict):
+    entry["status"] = "cancelled"
+    entry["finished_ts"] = ts
+    entry["duration_s"] = event.get("duration_s")
+
+
+def _on_step_skipped(entry: Dict[str, Any], event: dict, ts: Optional[str], data: dict):
+    entry["status"] = "skipped"
+    entry["finished_ts"] = ts
+    entry["message"] = data.get("reason") if data else ""
+
+
+_STEP_EVENT_HANDLERS = {
+    "step.started": _on_step_started,
+    "step.succeeded": _on_step_succeeded,
+    "step.failed": _on_step_failed,
+    "step.cancelled": _on_step_cancelled,
+    "step.skipped": _on_step_skipped,
+}
+
+
 def _summarize_steps_from_events(
-    events: list[dict],
+    events: Iterable[dict],
     pending_from_manifest: Optional[list[str]] = None,
 ) -> list[Dict[str, Any]]:
     """
-    Build step status summary from event stream.
+    Build step status summary from event stream in a single pass.
 
     Args:
-        events: List of event dicts loaded from events.jsonl
+        events: Event dicts from events.jsonl (a lazy iterator is fine)
         pending_from_manifest: Optional list of pending steps to include
 
     Returns:
         List of step summary dicts sorted by first timestamp
     """
     summaries: Dict[str, Dict[str, Any]] = {}
+    handlers = _STEP_EVENT_HANDLERS
 
     for event in events:
         step_id = event.get("step")
         if not step_id:
             continue
 
-        entry = summaries.setdefault(
-            step_id,
-            {
-                "step": step_id,
-                "status": "pending",
-                "started_ts": None,
-                "finished_ts": None,
-                "duration_s": None,
-                "provider_calls": 0,
-                "message": "",
-                "first_ts": event.get("ts"),
-            },
-        )
-
-        event_type = event.get("type")
-        if event_type == "step.started":
-            entry["status"] = "running"
-            entry["started_ts"] = event.get("ts")
-        elif event_type == "step.succeeded":
-            entry["status"] = "succeeded"
-            entry["finished_ts"] = event.get("ts")
-            entry["duration_s"] = event.get("duration_s") or event.get("data", {}).get(
-                "duration_s"
-            )
-            entry["provider_calls"] = event.get("provider_calls") or event.get(
-                "data", {}
-            ).get("provider_calls", 0)
-        elif event_type == "step.failed":
-            entry["status"] = "failed"
-            entry["finished_ts"] = event.get("ts")
-            entry["message"] = event.get("message") or event.get("data", {}).get(
-                "message", ""
-            )
-        elif event_type == "step.skipped":
-            entry["status"] = "skipped"
-            entry["finished_ts"] = event.get("ts")
-            entry["message"] = (
-                event.get("data", {}).get("reason") if event.get("data") else ""
-            )
+        ts = event.get("ts")
+        entry = summaries.get(step_id)
+        if entry is None:
+            entry = summaries[step_id] = _new_step_summary(step_id, ts)
+
+        handler = handlers.get(event.get("type"))
+        if handler is not None:
+            handler(entry, event, ts, event.get("data") or _EMPTY)
 
     if pending_from_manifest:
         for step_id in pending_from_manifest:
-            summaries.setdefault(
-                step_id,
-                {
-                    "step": step_id,
-                    "status": "pending",
-                    "started_ts": None,
-                    "finished_ts": None,
-                    "duration_s": None,
-                    "provider_calls": 0,
-                    "message": "",
-                    "first_ts": None,
-                },
-            )
+            if step_id not in summaries:
+                summaries[step_id] = _new_step_summary(step_id, None)
 
     return sorted(
         summaries.values(),
@@ -145,12 +195,21 @@ def run(
         orchestrator run examples/tiny_spec.yaml
         orchestrator run my_spec.yaml --provider openai --verbose
     """
+    import yaml
+    try:
+        from yaml import CSafeLoader as YamlLoader  # libyaml C parser
+    except ImportError:
+        from yaml import SafeLoader as YamlLoader
+    
+    from src.core.models import JobSpec
+    from src.orchestrator.dag_orchestrator import run_orchestrator
+    
     console.print(f"\n[bold blue]🚀 Starting Orchestration[/bold blue]\n")
     
     # Load spec
     try:
-        with open(spec, 'r') as f:
-            spec_data = yaml.safe_load(f)
+        with open(spec, 'rb') as f:
+            spec_data = yaml.load(f, Loader=YamlLoader)
         
         job_spec = JobSpec(**spec_data)
         
@@ -235,19 +294,22 @@ def show(
     if not run_dir.exists():
         console.print(f"[red]❌ Run not found: {job_id}[/red]")
         console.print(f"Available runs:")
-        for run in Path("runs").iterdir():
-            if run.is_dir():
-                console.print(f"  • {run.name}")
+        with os.scandir("runs") as it:
+            for entry in it:
+                if entry.is_dir():
+                    console.print(f"  • {entry.name}")
         raise typer.Exit(1)
     
     # Read manifest
-    manager = RunManager(job_id)
-    manifest = manager.read_manifest()
+    manifest = _load_manifest(run_dir)
     
     if not manifest:
         console.print(f"[red]❌ Manifest not found for {job_id}[/red]")
         raise typer.Exit(1)
     
+    from rich.panel import Panel
+    from rich.table import Table
+    
     # Display job info
     panel = Panel(
         f"""[bold]Job ID:[/bold] {manifest['job_id']}
@@ -263,10 +325,8 @@ def show(
     console.print(panel)
     
     events_path = run_dir / "events.jsonl"
-    event_list = read_events(events_path)
-
     step_summaries = _summarize_steps_from_events(
-        event_list,
+        iter_events(events_path),
         pending_from_manifest=manifest.get("pending_steps")
     )
 
@@ -285,6 +345,7 @@ def show(
             "running": ("yellow", "⏳"),
             "pending": ("white", "…"),
             "skipped": ("cyan", "⏭"),
+            "cancelled": ("magenta", "⏹"),
         }
 
         for summary in step_summaries:
@@ -326,13 +387,17 @@ def show(
         console.print("\n[bold]Generated Files:[/bold]")
         for file_info in manifest['files']:
             console.print(f"  📄 {file_info['path']}")
-            console.print(f"     SHA256: {file_info['sha256'][:16]}...")
+            algo = file_info.get('hash_algo', 'sha256').upper()
+            console.print(f"     {algo}: {file_info['sha256'][:16]}...")
             console.print(f"     Size: {file_info['size_bytes']} bytes")
     
     # Show events if requested
-    if events and event_list:
-        console.print(f"\n[bold]Events Timeline ({len(event_list)} events):[/bold]")
-        for event in event_list[:20]:
+    # Only the first 20 events are decoded; the rest are just counted
+    event_list = read_events_head(events_path, 20) if events else None
+    if event_list:
+        total_events = count_events(events_path)
+        console.print(f"\n[bold]Events Timeline ({total_events} events):[/bold]")
+        for event in event_list:
             timestamp = (event.get("ts") or "")[:19]
             event_type = event.get("type", "unknown")
             level = event.get("level", "INFO")
@@ -345,8 +410,8 @@ def show(
             else:
                 console.print(f"  {timestamp} | [{level}] {event_type}")
 
-        if len(event_list) > 20:
-            console.print(f"  ... and {len(event_list) - 20} more events")
+        if total_events > len(event_list):
+            console.print(f"  ... and {total_events - len(event_list)} more events")
     
     # Show failures
     if manifest.get('failures'):
@@ -379,17 +444,20 @@ def list_runs(
         console.print("[yellow]No runs found[/yellow]")
         return
     
-    # Get all runs sorted by modification time
-    runs = sorted(
-        runs_dir.iterdir(),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True
-    )[:limit]
+    # Get all runs sorted by modification time. One scandir pass: is_dir() comes
+    # from d_type, but stat() is still one syscall per run; the saving is in not
+    # building a Path for every entry, only for the runs that are kept.
+    with os.scandir(runs_dir) as it:
+        entries = [(e.stat().st_mtime_ns, e.name, e.path) for e in it if e.is_dir()]
+    # Bounded heap: O(N log limit) instead of sorting every run
+    runs = [Path(path) for _, _, path in heapq.nlargest(limit, entries)]
     
     if not runs:
         console.print("[yellow]No runs found[/yellow]")
         return
     
+    from rich.table import Table
+    
     console.print(f"\n[bold]Recent Runs (showing {len(runs)}):[/bold]\n")
     
     table = Table(show_header=True)
@@ -399,12 +467,16 @@ def list_runs(
     table.add_column("Duration")
     table.add_column("Started")
     
-    for run_dir in runs:
-        manifest_path = run_dir / "manifest.json"
-        if manifest_path.exists():
-            with open(manifest_path, 'r') as f:
-                manifest = json.load(f)
-            
+    # Manifest reads are independent small-file I/O: overlap them
+    if len(runs) == 1:
+        manifests = [_load_manifest(runs[0])]
+    else:
+        workers = min(_MANIFEST_READ_WORKERS, len(runs))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            manifests = list(pool.map(_load_manifest, runs))
+    
+    for run_dir, manifest in zip(runs, manifests):
+        if manifest is not None:
             status = manifest.get('status', 'unknown')
             status_display = f"[{'green' if status == 'succeeded' else 'red'}]{status}[/]"
             
@@ -450,7 +522,7 @@ def tail(
     interval: float = typer.Option(
         1.0,
         "--interval",
-        help="Polling interval in seconds when using --follow"
+        help="Polling interval in seconds for --follow when watchfiles is not installed"
     ),
 ):
     """
@@ -465,19 +537,30 @@ def tail(
         console.print(f"[red]❌ Events log not found for {job_id}[/red]")
         raise typer.Exit(1)
 
-    def parse_lines(lines: list[str]) -> list[dict]:
-        parsed = []
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                parsed.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
-        return parsed
-
-    def emit(events_batch: list[dict]):
+    position = 0  # Byte offset just past the last complete line consumed
+    # Cheap byte-level check so non-matching lines are never decoded
+    needles = prefilter_needles(event_type, step, level)
+
+    def read_new_events() -> Iterator[dict]:
+        """Stream events from complete lines appended since `position`."""
+        nonlocal position
+        with open(events_path, "rb") as f:
+            f.seek(position)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Partially written line: pick it up once complete
+                position += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                if needles and not all(needle in line for needle in needles):
+                    continue
+                try:
+                    yield _json_loads(line)
+                except ValueError:  # json and orjson decode errors both subclass it
+                    continue
+
+    def emit(events_batch: Iterable[dict]):
         for event in filter_events(events_batch, event_type, step, level):
             timestamp = (event.get("ts") or "")[:19]
             lvl = event.get("level", "INFO")
@@ -499,24 +582,29 @@ def tail(
                 console.print(f"{timestamp} [{lvl}] {etype}{detail}")
 
     try:
-        with open(events_path, "r") as f:
-            initial_lines = f.readlines()
-        emit(parse_lines(initial_lines))
+        emit(read_new_events())
 
         if not follow:
             return
 
         console.print("[cyan]-- follow mode --[/cyan]")
-        position = events_path.stat().st_size
 
-        while True:
-            with open(events_path, "r") as f:
-                f.seek(position)
-                new_lines = f.readlines()
-                position = f.tell()
+        try:
+            from watchfiles import watch
+        except ImportError:
+            watch = None
 
-            if new_lines:
-                emit(parse_lines(new_lines))
+        if watch is not None:
+            # Block on filesystem notifications instead of waking every interval
+            for _changes in watch(events_path):
+                if os.stat(events_path).st_size > position:
+                    emit(read_new_events())
+            return
+
+        while True:
+            # Only reopen the log once it has actually grown
+            if os.stat(events_path).st_size > position:
+                emit(read_new_events())
 
             time.sleep(interval)
     except KeyboardInterrupt:
@@ -10,16 +10,52 @@ Computes stable cache keys for LLM responses based on:
 import json
 import hashlib
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
+from .filestore import atomic_write
 
+try:
+    import orjson
+
+    _loads = orjson.loads  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+
+    def _compact_json(obj: Any) -> bytes:
+        """Compact UTF-8 JSON (orjson C encoder)"""
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _loads = json.loads
+
+    def _compact_json(obj: Any) -> bytes:
+        """Compact UTF-8 JSON (stdlib fallback)"""
+        return json.dumps(obj, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def _canonical_json(obj: Any) -> bytes:
+    """
+    Compact, key-sorted JSON for cache keys.
+    
+    Always the stdlib encoder, even when orjson is installed: the two
+    differ on non-ASCII (\\u escapes vs raw UTF-8), floats (1e+20 vs 1e20)
+    and datetimes, and a key must not depend on which one is present.
+    """
+    return json.dumps(
+        obj,
+        sort_keys=True,
+        separators=(',', ':'),  # No spaces
+        default=str,  # Handle non-JSON types
+    ).encode('utf-8')
+
+
+@lru_cache(maxsize=1)
 def get_code_version() -> str:
     """
     Get code version for cache invalidation.
     
     Returns git HEAD commit if in a git repo, otherwise returns
-    a hash of key source files.
+    a hash of key source files. Computed once per process; call
+    get_code_version.cache_clear() to force a re-read.
     
     Returns:
         Version string (git commit or file hash)
@@ -46,13 +82,13 @@ def get_code_version() -> str:
         "orchestrator/dag_orchestrator.py",
     ]
     
-    hasher = hashlib.sha256()
-    for file_rel in key_files:
-        file_path = src_dir / file_rel
-        if file_path.exists():
-            hasher.update(file_path.read_bytes())
+    parts = [
+        (src_dir / file_rel).read_bytes()
+        for file_rel in key_files
+        if (src_dir / file_rel).exists()
+    ]
     
-    return hasher.hexdigest()[:12]
+    return hashlib.sha256(b''.join(parts)).hexdigest()[:12]
 
 
 def compute_cache_key(
@@ -103,19 +139,11 @@ def compute_cache_key(
         "code_version": code_version,
     }
     
-    # Serialize to JSON with sorted keys for determinism
-    cache_json = json.dumps(
-        cache_input,
-        sort_keys=True,
-        separators=(',', ':'),  # No spaces
-        default=str,  # Handle non-JSON types
-    )
-    
-    # Hash to get fixed-length key
-    hasher = hashlib.sha256()
-    hasher.update(cache_json.encode('utf-8'))
+    # Serialize to JSON bytes with sorted keys for determinism
+    cache_bytes = _canonical_json(cache_input)
     
-    return hasher.hexdigest()
+    # Hash to get fixed-length key (one-shot: no incremental hasher object)
+    return hashlib.sha256(cache_bytes).hexdigest()
 
 
 def cache_path(job_id: str, cache_key: str) -> Path:
@@ -142,13 +170,10 @@ def read_cache(cache_file: Path) -> Optional[dict]:
     Returns:
         Cached data dict or None if not found/invalid
     """
-    if not cache_file.exists():
-        return None
-    
     try:
-        with open(cache_file, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
+        with open(cache_file, 'rb') as f:  # UTF-8 bytes, whatever the locale
+            return _loads(f.read())
+    except (json.JSONDecodeError, IOError):  # IOError covers a missing file
         return None
 
 
@@ -156,12 +181,12 @@ def write_cache(cache_file: Path, data: dict):
     """
     Write cache entry to disk.
     
+    The entry is written as compact JSON with atomic_write, so readers
+    never see a partially written entry.
+    
     Args:
         cache_file: Path to cache file
         data: Data to cache (must be JSON-serializable)
     """
     cache_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(cache_file, 'w') as f:
-        json.dump(data, f, indent=2, default=str)
-
+    atomic_write(cache_file, _compact_json(data))
@@ -38,6 +38,8 @@ class CircuitBreaker:
     _failure_count: int = field(default=0, init=False)
     _last_failure_time: Optional[float] = field(default=None, init=False)
     _opened_at: Optional[float] = field(default=None, init=False)
+    # Mirrors state == CLOSED so the common path is a single attribute load
+    _closed: bool = field(default=True, init=False, repr=False)
 
     def call(self, func: Callable, *args, **kwargs) -> Any:
         """
@@ -55,24 +57,29 @@ class CircuitBreaker:
             CircuitBreakerOpen: When circuit is open and cooldown not expired
             Exception: Original exception from func if circuit allows execution
         """
-        if self.state == CircuitState.OPEN:
+        if not self._closed and self.state == CircuitState.OPEN:
             # Check if cooldown period has passed
-            if self._opened_at and time.time() - self._opened_at >= self.cooldown:
+            if self._opened_at and time.monotonic() - self._opened_at >= self.cooldown:
                 self._transition_to_half_open()
             else:
                 raise CircuitBreakerOpen(
                     f"Circuit breaker OPEN (cooldown: {self.cooldown}s, "
-                    f"opened {time.time() - (self._opened_at or 0):.1f}s ago)"
+                    f"opened {time.monotonic() - (self._opened_at or 0):.1f}s ago)"
                 )
 
         try:
             result = func(*args, **kwargs)
-            self._on_success()
-            return result
-        except Exception as e:
+        except Exception:
             self._on_failure()
             raise
 
+        if self._closed:
+            # Fast path: reset failure count on success
+            self._failure_count = 0
+        else:
+            self._on_success()
+        return result
+
     def _on_success(self):
         """Handle successful execution"""
         if self.state == CircuitState.HALF_OPEN:
@@ -85,7 +92,7 @@ class CircuitBreaker:
     def _on_failure(self):
         """Handle failed execution"""
         self._failure_count += 1
-        self._last_failure_time = time.time()
+        self._last_failure_time = time.monotonic()
 
         if self.state == CircuitState.HALF_OPEN:
             # Failed during recovery, reopen circuit
@@ -98,16 +105,19 @@ class CircuitBreaker:
     def _transition_to_open(self):
         """Transition to OPEN state"""
         self.state = CircuitState.OPEN
-        self._opened_at = time.time()
+        self._closed = False
+        self._opened_at = time.monotonic()
         self._failure_count = 0
 
     def _transition_to_half_open(self):
         """Transition to HALF_OPEN state"""
         self.state = CircuitState.HALF_OPEN
+        self._closed = False
 
     def _transition_to_closed(self):
         """Transition to CLOSED state"""
         self.state = CircuitState.CLOSED
+        self._closed = True
         self._failure_count = 0
         self._opened_at = None
 
@@ -5,13 +5,17 @@ Replaces linear sequential execution with concurrent task execution.
 """
 
 import asyncio
+import time
+from collections import deque
 from typing import Callable, Any, Optional
 from dataclasses import dataclass
-from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
+from datetime import datetime, timedelta
 from pathlib import Path
 
 from .models import StepResult, Failure
-from .events import EventEmitter, read_events
+from .events import EventEmitter, iter_events
 
 
 @dataclass
@@ -31,6 +35,80 @@ class DAGNode:
     description: str = ""
 
 
+def _make_deps_getter(needs: tuple[str, ...]) -> Callable[[dict], dict]:
+    """
+    Build a callable that slices a node's dependency results out of the
+    shared results dict, with the key tuple and itemgetter bound up front.
+    """
+    keys = tuple(needs)
+    if not keys:
+        return lambda results: {}
+    getter = itemgetter(*keys)
+    if len(keys) == 1:
+        # itemgetter with a single key returns the value, not a tuple
+        key = keys[0]
+        return lambda results: {key: getter(results)}
+    return lambda results: dict(zip(keys, getter(results)))
+
+
+@lru_cache(maxsize=64)
+def _plan_for_shape(
+    shape: tuple[tuple[str, tuple[str, ...]], ...]
+) -> tuple[dict[str, list[str]], dict[str, Callable[[dict], dict]]]:
+    """
+    Validate a DAG shape and build its scheduling indexes.
+    
+    Args:
+        shape: Output of DAG.shape()
+        
+    Returns:
+        (reverse-dependency index, per-node dependency getters). Shared
+        between DAGs of the same shape: treat as read-only.
+        
+    Raises:
+        ValueError: If the shape has missing dependencies or a cycle
+    """
+    needs_of = dict(shape)
+    
+    # Check all dependencies exist
+    for node_id, needs in shape:
+        for dep in needs:
+            if dep not in needs_of:
+                raise ValueError(
+                    f"Node {node_id} depends on {dep} which doesn't exist"
+                )
+    
+    # Check for cycles using iterative DFS (no recursion limit on deep chains)
+    UNSEEN, ON_STACK, DONE = 0, 1, 2
+    state = dict.fromkeys(needs_of, UNSEEN)
+    
+    for root in needs_of:
+        if state[root] != UNSEEN:
+            continue
+        state[root] = ON_STACK
+        stack = [(root, iter(needs_of[root]))]
+        while stack:
+            node_id, deps = stack[-1]
+            dep = next(deps, None)
+            if dep is None:
+                state[node_id] = DONE
+                stack.pop()
+            elif state[dep] == ON_STACK:
+                raise ValueError(f"DAG contains a cycle (through '{dep}')")
+            elif state[dep] == UNSEEN:
+                state[dep] = ON_STACK
+                stack.append((dep, iter(needs_of[dep])))
+    
+    # Reverse-dependency index
+    dependents: dict[str, list[str]] = {node_id: [] for node_id in needs_of}
+    for node_id, needs in shape:
+        for dep in needs:
+            dependents[dep].append(node_id)
+    
+    deps_getters = {node_id: _make_deps_getter(needs) for node_id, needs in shape}
+    return dependents, deps_getters
+
+
 class DAG:
     """
     Directed Acyclic Graph for workflow execution.
@@ -40,6 +118,10 @@ class DAG:
     
     def __init__(self):
         self.nodes: dict[str, DAGNode] = {}
+        # Reverse-dependency index and unmet-dependency counters (built by validate())
+        self._dependents: dict[str, list[str]] = {}
+        self._pending_deps: dict[str, int] = {}
+        self._deps_getters: dict[str, Callable[[dict], dict]] = {}
     
     def add_node(self, node: DAGNode):
         """Add a node to the DAG"""
@@ -47,44 +129,50 @@ class DAG:
             raise ValueError(f"Node {node.id} already exists")
         self.nodes[node.id] = node
     
+    def shape(self) -> tuple[tuple[str, tuple[str, ...]], ...]:
+        """Hashable (node id, needs) structure of the DAG, ignoring step functions"""
+        return tuple((node_id, tuple(node.needs)) for node_id, node in self.nodes.items())
+    
     def validate(self):
         """
         Validate DAG has no cycles and all dependencies exist.
         
+        The checks and the scheduling indexes derived from them depend only
+        on the DAG's shape, so they are computed once per shape and reused
+        by every DAG built from the same step templates.
+        
         Raises:
             ValueError: If DAG is invalid (cycles or missing deps)
         """
-        # Check all dependencies exist
-        for node in self.nodes.values():
-            for dep in node.needs:
-                if dep not in self.nodes:
-                    raise ValueError(
-                        f"Node {node.id} depends on {dep} which doesn't exist"
-                    )
+        dependents, deps_getters = _plan_for_shape(self.shape())
         
-        # Check for cycles using DFS
-        visited = set()
-        rec_stack = set()
+        self._dependents = dependents
+        self._deps_getters = deps_getters
+        self._pending_deps = {
+            node_id: len(node.needs) for node_id, node in self.nodes.items()
+        }
+    
+    def mark_complete(self, node_id: str) -> list[str]:
+        """
+        Record a node as complete and return nodes it unblocked.
         
-        def has_cycle(node_id: str) -> bool:
-            visited.add(node_id)
-            rec_stack.add(node_id)
-            
-            node = self.nodes[node_id]
-            for dep in node.needs:
-                if dep not in visited:
-                    if has_cycle(dep):
-                        return True
-                elif dep in rec_stack:
-                    return True
-            
-            rec_stack.remove(node_id)
-            return False
+        Decrements the unmet-dependency counter of each dependent; a node
+        becomes ready exactly when its counter reaches zero. Call validate()
+        first, and mark each node complete at most once per run.
         
-        for node_id in self.nodes:
-            if node_id not in visited:
-                if has_cycle(node_id):
-                    raise ValueError("DAG contains a cycle")
+        Args:
+            node_id: ID of the node that just completed
+            
+        Returns:
+            IDs of nodes whose dependencies are now all complete
+        """
+        pending = self._pending_deps
+        newly_ready = []
+        for dependent in self._dependents[node_id]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                newly_ready.append(dependent)
+        return newly_ready
     
     def get_ready_nodes(self, completed: set[str]) -> list[DAGNode]:
         """
@@ -123,9 +211,7 @@ def read_completed_steps(events_path: Path) -> set[str]:
         return set()
     
     completed = set()
-    events = read_events(events_path)
-    
-    for event in events:
+    for event in iter_events(events_path):
         if event.get('type') == 'step.succeeded':
             step_id = event.get('step')
             if step_id:
@@ -197,12 +283,15 @@ async def run_dag(
                     'level': 'INFO',
                     'data': {'reason': 'resume'},
                 })
+                dag.mark_complete(step_id)
     semaphore = asyncio.Semaphore(concurrency)
+    deps_getters = dag._deps_getters
     
     async def execute_node(node: DAGNode) -> StepResult:
         """Execute a single node with semaphore control"""
         async with semaphore:
             step_start = datetime.utcnow()
+            t0 = time.monotonic()  # Durations from the monotonic clock
             
             # Emit step.started event
             events.step_started(job_id, node.id, node.needs)
@@ -210,7 +299,7 @@ async def run_dag(
             try:
                 # Execute step function
                 # Pass results from dependencies
-                dep_results = {dep_id: results[dep_id] for dep_id in node.needs}
+                dep_results = deps_getters[node.id](results)
                 
                 # Call step function (may be sync or async)
                 if asyncio.iscoroutinefunction(node.fn):
@@ -218,8 +307,8 @@ async def run_dag(
                 else:
                     output = await asyncio.to_thread(node.fn, context, dep_results)
                 
-                step_end = datetime.utcnow()
-                duration = (step_end - step_start).total_seconds()
+                duration = time.monotonic() - t0
+                step_end = step_start + timedelta(seconds=duration)
                 
                 # Create success result
                 result = StepResult(
@@ -237,23 +326,26 @@ async def run_dag(
                 return result
                 
             except Exception as e:
-                step_end = datetime.utcnow()
-                duration = (step_end - step_start).total_seconds()
+                duration = time.monotonic() - t0
+                step_end = step_start + timedelta(seconds=duration)
                 
-                # Determine failure kind
-                error_kind = "provider"
-                if "timeout" in str(e).lower():
+                # Determine failure kind (stringify and lower-case once)
+                message = str(e)
+                lowered = message.lower()
+                if "timeout" in lowered:
                     error_kind = "timeout"
-                elif "validation" in str(e).lower():
+                elif "validation" in lowered:
                     error_kind = "validation"
-                elif "tool" in str(e).lower():
+                elif "tool" in lowered:
                     error_kind = "tool"
+                else:
+                    error_kind = "provider"
                 
                 # Create failure
                 failure = Failure(
                     kind=error_kind,
                     step=node.id,
-                    message=str(e),
+                    message=message,
                     data={"exception_type": type(e).__name__}
                 )
                 
@@ -268,44 +360,63 @@ async def run_dag(
                 )
                 
                 # Emit step.failed event
-                events.step_failed(job_id, node.id, error_kind, str(e))
+                events.step_failed(job_id, node.id, error_kind, message)
                 
                 # Re-raise to stop DAG execution
                 raise
+            
+            except asyncio.CancelledError:
+                # Stopped by another step's failure or the DAG timeout: record
+                # a terminal event so the step doesn't read as still running
+                events.step_cancelled(job_id, node.id, time.monotonic() - t0)
+                raise
     
-    async def run_wave():
-        """Execute one wave of ready nodes"""
-        ready = dag.get_ready_nodes(completed)
-        if not ready:
-            return False  # No more work
+    async def execute_all():
+        """
+        Dataflow scheduling: start each node as soon as its own dependencies
+        finish, rather than waiting for a whole wave of siblings.
+        """
+        running: dict[asyncio.Task, DAGNode] = {}
         
-        # Execute all ready nodes in parallel
-        tasks = [execute_node(node) for node in ready]
-        wave_results = await asyncio.gather(*tasks, return_exceptions=True)
+        def schedule(nodes):
+            for node in nodes:
+                running[asyncio.create_task(execute_node(node))] = node
         
-        # Process results
-        for node, result in zip(ready, wave_results):
-            if isinstance(result, Exception):
-                # Failure - propagate up
-                raise result
-            else:
-                # Success - record and mark complete
-                results[node.id] = result
-                completed.add(node.id)
+        # Full scan once; afterwards the dependency counters drive readiness
+        schedule(dag.get_ready_nodes(completed))
         
-        return True  # More work may be available
-    
-    # Execute waves until complete
-    async def execute_all():
-        while len(completed) < len(dag.nodes):
-            has_work = await run_wave()
-            if not has_work and len(completed) < len(dag.nodes):
-                # Deadlock - some nodes can't execute
-                pending = set(dag.nodes.keys()) - completed
-                raise RuntimeError(
-                    f"DAG deadlock: nodes {pending} cannot execute. "
-                    f"Check dependencies."
-                )
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    node = running.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        # Fail fast: in-flight siblings are cancelled below
+                        raise error
+                    
+                    results[node.id] = task.result()
+                    completed.add(node.id)
+                    schedule(
+                        dag.nodes[node_id]
+                        for node_id in dag.mark_complete(node.id)
+                        if node_id not in completed
+                    )
+        finally:
+            # Cancel whatever is still running (first failure or DAG timeout)
+            # and wait for it to unwind so no step outlives run_dag
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        
+        if len(completed) < len(dag.nodes):
+            # Deadlock - some nodes can't execute
+            pending = set(dag.nodes.keys()) - completed
+            raise RuntimeError(
+                f"DAG deadlock: nodes {pending} cannot execute. "
+                f"Check dependencies."
+            )
     
     # Run with optional timeout
     if timeout_s:
@@ -330,27 +441,20 @@ def topological_sort(dag: DAG) -> list[str]:
     """
     dag.validate()
     
-    in_degree = {node_id: 0 for node_id in dag.nodes}
-    
-    # Count incoming edges
-    for node in dag.nodes.values():
-        for dep in node.needs:
-            in_degree[node.id] += 1
+    in_degree = {node_id: len(node.needs) for node_id, node in dag.nodes.items()}
     
     # Start with nodes that have no dependencies
-    queue = [node_id for node_id, degree in in_degree.items() if degree == 0]
+    queue = deque(node_id for node_id, degree in in_degree.items() if degree == 0)
     result = []
     
     while queue:
-        node_id = queue.pop(0)
+        node_id = queue.popleft()
         result.append(node_id)
         
-        # Reduce in-degree of dependent nodes
-        for other_id, node in dag.nodes.items():
-            if node_id in node.needs:
-                in_degree[other_id] -= 1
-                if in_degree[other_id] == 0:
-                    queue.append(other_id)
+        # Reduce in-degree of dependent nodes (reverse index built by validate())
+        for other_id in dag._dependents[node_id]:
+            in_degree[other_id] -= 1
+            if in_degree[other_id] == 0:
+                queue.append(other_id)
     
     return result
-
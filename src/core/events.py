@@ -5,10 +5,34 @@ Each job gets its own events.jsonl file in runs/<job_id>/events.jsonl
 """
 
 import json
+import mmap
+import os
+import queue
+import threading
+import time
 from pathlib import Path
-from datetime import datetime
-from typing import Any, Literal, Optional, TypedDict, NotRequired
+from typing import Any, Iterable, Iterator, Literal, Optional, TypedDict, NotRequired
 from contextlib import contextmanager
+from itertools import islice
+
+try:
+    import orjson
+
+    _loads = orjson.loads  # Faster C decoder when installed
+
+    def _dumps_line(event: dict[str, Any]) -> bytes:
+        """Encode one event as a UTF-8 ND-JSON line (orjson C encoder)"""
+        return orjson.dumps(
+            event,
+            default=str,
+            option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS,
+        )
+except ImportError:
+    _loads = json.loads
+
+    def _dumps_line(event: dict[str, Any]) -> bytes:
+        """Encode one event as a UTF-8 ND-JSON line (stdlib fallback)"""
+        return (json.dumps(event, default=str) + '\n').encode('utf-8')
 
 
 class Event(TypedDict):
@@ -33,6 +57,32 @@ class Event(TypedDict):
     data: NotRequired[dict[str, Any]]
 
 
+def _encode_str(value: str) -> bytes:
+    """JSON-encode a single string (quoted and escaped)"""
+    return _dumps_line(value)[:-1]
+
+
+def _drain_to_file(q: queue.SimpleQueue, log_file, errors: list):
+    """
+    Writer-thread loop: write queued batches until the None sentinel.
+    
+    The first write error is appended to errors (for the emitter to
+    re-raise) and later batches are dropped, but the loop keeps running so
+    flush(wait=True) markers are still released.
+    """
+    while True:
+        item = q.get()
+        if item is None:
+            return
+        if isinstance(item, threading.Event):
+            item.set()  # Everything queued before this marker is handled
+        elif not errors:
+            try:
+                log_file.write(item)
+            except Exception as e:  # e.g. ENOSPC, EIO
+                errors.append(e)
+
+
 class EventEmitter:
     """
     Emits structured events to ND-JSON log files.
@@ -41,31 +91,102 @@ class EventEmitter:
     streaming analysis and easy parsing.
     """
     
-    def __init__(self, log_path: Path):
+    # Pending bytes are written out in one write() once they reach this size
+    FLUSH_THRESHOLD = 32 * 1024
+    # Step/job outcomes are flushed right away so `orchestrator tail -f` keeps up
+    FLUSH_TYPES = frozenset({
+        'step.succeeded', 'step.failed', 'step.cancelled', 'job.succeeded', 'job.failed',
+    })
+    
+    # Fixed part of each typed event; helpers copy one and fill in the rest
+    _TPL_JOB_STARTED = {'type': 'job.started', 'level': 'INFO'}
+    _TPL_JOB_SUCCEEDED = {'type': 'job.succeeded', 'level': 'INFO'}
+    _TPL_JOB_FAILED = {'type': 'job.failed', 'level': 'INFO'}
+    _TPL_STEP_STARTED = {'type': 'step.started', 'level': 'INFO'}
+    _TPL_STEP_SUCCEEDED = {'type': 'step.succeeded', 'level': 'INFO'}
+    _TPL_STEP_FAILED = {'type': 'step.failed', 'level': 'INFO'}
+    _TPL_STEP_CANCELLED = {'type': 'step.cancelled', 'level': 'WARN'}
+    _TPL_PROVIDER_CALL = {'type': 'provider.call', 'level': 'INFO'}
+    _TPL_ARTIFACT_CREATED = {'type': 'artifact.created', 'level': 'INFO'}
+    _TPL_LLM_REQUEST = {'type': 'llm.request', 'level': 'INFO'}
+    _TPL_LLM_RESPONSE = {'type': 'llm.response', 'level': 'INFO'}
+    _TPL_FILE_WRITTEN = {'type': 'file.written', 'level': 'INFO'}
+    _TPL_CACHE_HIT = {'type': 'cache.hit', 'level': 'INFO'}
+    _TPL_CACHE_MISS = {'type': 'cache.miss', 'level': 'INFO'}
+    
+    # Encoded equivalents for the emit_raw fast path
+    _RAW_STEP_STARTED = b'{"type":"step.started","level":"INFO",'
+    _RAW_CACHE_HIT = b'{"type":"cache.hit","level":"INFO",'
+    _RAW_CACHE_MISS = b'{"type":"cache.miss","level":"INFO",'
+    
+    def __init__(self, log_path: Path, background: bool = False):
         """
         Initialize event emitter.
         
         Args:
             log_path: Path to events.jsonl file
+            background: Hand batches to a writer thread instead of writing
+                        them on the calling thread. close() (or
+                        flush(wait=True)) must be called for the log to be
+                        complete on disk.
         """
         self.log_path = log_path
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Create/open log file
-        self._log_file = open(self.log_path, 'a', buffering=1)  # Line buffered
+        # Create/open log file (unbuffered: batching happens in _buffer)
+        self._log_file = open(self.log_path, 'ab', buffering=0)
+        self._buffer = bytearray()
+        # Guards _buffer: steps run via asyncio.to_thread emit from other threads
+        self._buffer_lock = threading.Lock()
+        
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._writer_errors: list[Exception] = []
+        if background:
+            self._queue = queue.SimpleQueue()
+            # The thread only holds the queue and file, so the emitter can still be collected
+            self._writer = threading.Thread(
+                target=_drain_to_file,
+                args=(self._queue, self._log_file, self._writer_errors),
+                name="event-writer",
+                daemon=True,
+            )
+            self._writer.start()
+        
+        # Last formatted timestamp, reused for events within the same millisecond
+        self._last_ts_sec = 0.0
+        self._last_ts_str = ''
+        
+        # Set by bind_job(): the job whose events take the emit_raw fast path
+        self._job_id: Optional[str] = None
+        self._job_prefix = b''
+    
+    def _timestamp(self) -> str:
+        """ISO8601 UTC timestamp with microseconds, formatted at most once per ms"""
+        now = time.time()
+        if not 0 <= now - self._last_ts_sec < 0.001:  # Also refresh if the clock stepped back
+            self._last_ts_sec = now
+            self._last_ts_str = (
+                time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(now))
+                + f'.{int((now % 1) * 1e6):06d}Z'
+            )
+        return self._last_ts_str
     
     def emit(self, event: dict[str, Any]):
         """
         Emit a typed event to the log.
         
         Automatically adds ISO8601 timestamp and defaults level to INFO.
+        Fields that are None or an empty dict/list are omitted.
+        Events are buffered and written in batches; ERROR events, step/job
+        outcomes, flush() and close() write everything pending immediately.
         
         Args:
             event: Event dict conforming to Event TypedDict structure
         """
         # Add timestamp if not present (use 'ts' for v2.1)
         if 'ts' not in event:
-            event['ts'] = datetime.utcnow().isoformat() + 'Z'
+            event['ts'] = self._timestamp()
         
         # Add default level if not present
         if 'level' not in event:
@@ -75,47 +196,127 @@ class EventEmitter:
         if 'type' not in event or 'job_id' not in event:
             raise ValueError("Event must have 'type' and 'job_id' fields")
         
-        # Write as ND-JSON
-        json_line = json.dumps(event, default=str)
-        self._log_file.write(json_line + '\n')
-        self._log_file.flush()
+        # Drop unset/empty fields to keep lines short (0/False/'' are kept)
+        event = {
+            k: v for k, v in event.items()
+            if v is not None and (v or not isinstance(v, (dict, list)))
+        }
+        
+        # Append as ND-JSON
+        line = _dumps_line(event)
+        with self._buffer_lock:
+            self._buffer += line
+            pending = len(self._buffer)
+        
+        if (
+            event['level'] == 'ERROR'
+            or event['type'] in self.FLUSH_TYPES
+            or pending >= self.FLUSH_THRESHOLD
+        ):
+            self.flush()
+    
+    def flush(self, wait: bool = False):
+        """
+        Write any buffered events to the log file.
+        
+        Args:
+            wait: With a background writer, block until everything emitted
+                  so far is on disk (needed before reading the log back)
+        
+        Raises:
+            OSError: If the background writer failed to write an earlier batch
+        """
+        self._raise_writer_error()
+        
+        # Hand off and clear under the lock so concurrent emits aren't lost
+        with self._buffer_lock:
+            if self._buffer:
+                if self._queue is None:
+                    self._log_file.write(self._buffer)
+                else:
+                    self._queue.put(bytes(self._buffer))
+                self._buffer.clear()
+        
+        if wait and self._queue is not None:
+            written = threading.Event()
+            self._queue.put(written)
+            written.wait()
+            self._raise_writer_error()
+    
+    def _raise_writer_error(self):
+        """Re-raise the background writer's write error, if it had one"""
+        if self._writer_errors:
+            raise self._writer_errors[0]
+    
+    def bind_job(self, job_id: str):
+        """
+        Precompute the encoded job_id fragment for this emitter's job so
+        its high-frequency events can skip dict building and full encoding.
+        
+        Args:
+            job_id: Job whose events this emitter writes
+        """
+        self._job_id = job_id
+        self._job_prefix = b'"job_id":' + _encode_str(job_id)
+    
+    def emit_raw(self, head: bytes, payload: bytes):
+        """
+        Append a pre-encoded INFO event for the bound job.
+        
+        Args:
+            head: '{"type":"...","level":"INFO",' fragment (see _RAW_*)
+            payload: Remaining encoded fields, without braces or leading comma
+        """
+        line = (
+            head + self._job_prefix
+            + b',"ts":"' + self._timestamp().encode('ascii') + b'",'
+            + payload + b'}\n'
+        )
+        with self._buffer_lock:
+            self._buffer += line
+            pending = len(self._buffer)
+        if pending >= self.FLUSH_THRESHOLD:
+            self.flush()
     
     def job_started(self, job_id: str, spec: dict[str, Any]):
         """Emit job.started event"""
-        self.emit({
-            'type': 'job.started',
-            'job_id': job_id,
-            'project': spec.get('project'),
-            'provider': spec.get('provider'),
-            'task': spec.get('task_description'),
-        })
+        event = self._TPL_JOB_STARTED.copy()
+        event['job_id'] = job_id
+        event['project'] = spec.get('project')
+        event['provider'] = spec.get('provider')
+        event['task'] = spec.get('task_description')
+        self.emit(event)
     
     def job_succeeded(self, job_id: str, duration_s: float, artifact_count: int):
         """Emit job.succeeded event"""
-        self.emit({
-            'type': 'job.succeeded',
-            'job_id': job_id,
-            'duration_s': duration_s,
-            'artifacts': artifact_count,
-        })
+        event = self._TPL_JOB_SUCCEEDED.copy()
+        event['job_id'] = job_id
+        event['duration_s'] = duration_s
+        event['artifacts'] = artifact_count
+        self.emit(event)
     
     def job_failed(self, job_id: str, error: str, duration_s: float):
         """Emit job.failed event"""
-        self.emit({
-            'type': 'job.failed',
-            'job_id': job_id,
-            'error': error,
-            'duration_s': duration_s,
-        })
+        event = self._TPL_JOB_FAILED.copy()
+        event['job_id'] = job_id
+        event['error'] = error
+        event['duration_s'] = duration_s
+        self.emit(event)
     
     def step_started(self, job_id: str, step_id: str, dependencies: list[str]):
         """Emit step.started event"""
-        self.emit({
-            'type': 'step.started',
-            'job_id': job_id,
-            'step': step_id,
-            'needs': dependencies,
-        })
+        if job_id == self._job_id:
+            payload = b'"step":' + _encode_str(step_id)
+            if dependencies:
+                payload += b',"needs":' + _dumps_line(dependencies)[:-1]
+            self.emit_raw(self._RAW_STEP_STARTED, payload)
+            return
+        
+        event = self._TPL_STEP_STARTED.copy()
+        event['job_id'] = job_id
+        event['step'] = step_id
+        event['needs'] = dependencies
+        self.emit(event)
     
     def step_succeeded(
         self,
@@ -125,13 +326,12 @@ class EventEmitter:
         provider_calls: int = 0
     ):
         """Emit step.succeeded event"""
-        self.emit({
-            'type': 'step.succeeded',
-            'job_id': job_id,
-            'step': step_id,
-            'duration_s': duration_s,
-            'provider_calls': provider_calls,
-        })
+        event = self._TPL_STEP_SUCCEEDED.copy()
+        event['job_id'] = job_id
+        event['step'] = step_id
+        event['duration_s'] = duration_s
+        event['provider_calls'] = provider_calls
+        self.emit(event)
     
     def step_failed(
         self,
@@ -142,14 +342,21 @@ class EventEmitter:
         data: Optional[dict] = None
     ):
         """Emit step.failed event"""
-        self.emit({
-            'type': 'step.failed',
-            'job_id': job_id,
-            'step': step_id,
-            'kind': kind,
-            'message': message,
-            'data': data or {},
-        })
+        event = self._TPL_STEP_FAILED.copy()
+        event['job_id'] = job_id
+        event['step'] = step_id
+        event['kind'] = kind
+        event['message'] = message
+        event['data'] = data or {}
+        self.emit(event)
+    
+    def step_cancelled(self, job_id: str, step_id: str, duration_s: float):
+        """Emit step.cancelled event (step stopped by a sibling's failure or timeout)"""
+        event = self._TPL_STEP_CANCELLED.copy()
+        event['job_id'] = job_id
+        event['step'] = step_id
+        event['duration_s'] = duration_s
+        self.emit(event)
     
     def provider_call(
         self,
@@ -161,15 +368,14 @@ class EventEmitter:
         tokens_out: int = 0
     ):
         """Emit provider.call event"""
-        self.emit({
-            'type': 'provider.call',
-            'job_id': job_id,
-            'step': step_id,
-            'provider': provider,
-            'duration_s': duration_s,
-            'tokens_in': tokens_in,
-            'tokens_out': tokens_out,
-        })
+        event = self._TPL_PROVIDER_CALL.copy()
+        event['job_id'] = job_id
+        event['step'] = step_id
+        event['provider'] = provider
+        event['duration_s'] = duration_s
+        event['tokens_in'] = tokens_in
+        event['tokens_out'] = tokens_out
+        self.emit(event)
     
     def artifact_created(
         self,
@@ -180,14 +386,13 @@ class EventEmitter:
         size_bytes: int
     ):
         """Emit artifact.created event"""
-        self.emit({
-            'type': 'artifact.created',
-            'job_id': job_id,
-            'step': step_id,
-            'path': path,
-            'sha256': sha256,
-            'size_bytes': size_bytes,
-        })
+        event = self._TPL_ARTIFACT_CREATED.copy()
+        event['job_id'] = job_id
+        event['step'] = step_id
+        event['path'] = path
+        event['sha256'] = sha256
+        event['size_bytes'] = size_bytes
+        self.emit(event)
     
     def llm_request(
         self,
@@ -198,17 +403,15 @@ class EventEmitter:
         prompt_tokens: int = 0
     ):
         """Emit llm.request event"""
-        self.emit({
-            'type': 'llm.request',
-            'job_id': job_id,
-            'step': step_id,
-            'level': 'INFO',
-            'data': {
-                'provider': provider,
-                'model': model,
-                'prompt_tokens': prompt_tokens,
-            }
-        })
+        event = self._TPL_LLM_REQUEST.copy()
+        event['job_id'] = job_id
+        event['step'] = step_id
+        event['data'] = {
+            'provider': provider,
+            'model': model,
+            'prompt_tokens': prompt_tokens,
+        }
+        self.emit(event)
     
     def llm_response(
         self,
@@ -221,19 +424,19 @@ class EventEmitter:
         success: bool = True
     ):
         """Emit llm.response event"""
-        self.emit({
-            'type': 'llm.response',
-            'job_id': job_id,
-            'step': step_id,
-            'level': 'INFO' if success else 'WARN',
-            'data': {
-                'provider': provider,
-                'duration_s': duration_s,
-                'tokens_in': tokens_in,
-                'tokens_out': tokens_out,
-                'success': success,
-            }
-        })
+        event = self._TPL_LLM_RESPONSE.copy()
+        event['job_id'] = job_id
+        event['step'] = step_id
+        if not success:
+            event['level'] = 'WARN'
+        event['data'] = {
+            'provider': provider,
+            'duration_s': duration_s,
+            'tokens_in': tokens_in,
+            'tokens_out': tokens_out,
+            'success': success,
+        }
+        self.emit(event)
     
     def file_written(
         self,
@@ -245,18 +448,16 @@ class EventEmitter:
         reason: Literal["created", "nochange", "overwritten", "appended"]
     ):
         """Emit file.written event"""
-        self.emit({
-            'type': 'file.written',
-            'job_id': job_id,
-            'step': step_id,
-            'level': 'INFO',
-            'data': {
-                'path': path,
-                'sha256': sha256,
-                'wrote': wrote,
-                'reason': reason,
-            }
-        })
+        event = self._TPL_FILE_WRITTEN.copy()
+        event['job_id'] = job_id
+        event['step'] = step_id
+        event['data'] = {
+            'path': path,
+            'sha256': sha256,
+            'wrote': wrote,
+            'reason': reason,
+        }
+        self.emit(event)
     
     def cache_hit(
         self,
@@ -265,15 +466,19 @@ class EventEmitter:
         cache_key: str
     ):
         """Emit cache.hit event"""
-        self.emit({
-            'type': 'cache.hit',
-            'job_id': job_id,
-            'step': step_id,
-            'level': 'INFO',
-            'data': {
-                'cache_key': cache_key,
-            }
-        })
+        if job_id == self._job_id:
+            self.emit_raw(
+                self._RAW_CACHE_HIT,
+                b'"step":' + _encode_str(step_id)
+                + b',"data":{"cache_key":' + _encode_str(cache_key) + b'}',
+            )
+            return
+        
+        event = self._TPL_CACHE_HIT.copy()
+        event['job_id'] = job_id
+        event['step'] = step_id
+        event['data'] = {'cache_key': cache_key}
+        self.emit(event)
     
     def cache_miss(
         self,
@@ -282,20 +487,37 @@ class EventEmitter:
         cache_key: str
     ):
         """Emit cache.miss event"""
-        self.emit({
-            'type': 'cache.miss',
-            'job_id': job_id,
-            'step': step_id,
-            'level': 'INFO',
-            'data': {
-                'cache_key': cache_key,
-            }
-        })
+        if job_id == self._job_id:
+            self.emit_raw(
+                self._RAW_CACHE_MISS,
+                b'"step":' + _encode_str(step_id)
+                + b',"data":{"cache_key":' + _encode_str(cache_key) + b'}',
+            )
+            return
+        
+        event = self._TPL_CACHE_MISS.copy()
+        event['job_id'] = job_id
+        event['step'] = step_id
+        event['data'] = {'cache_key': cache_key}
+        self.emit(event)
     
     def close(self):
-        """Close the log file"""
-        if hasattr(self, '_log_file') and self._log_file:
-            self._log_file.close()
+        """
+        Flush pending events and close the log file.
+        
+        Raises:
+            OSError: If a buffered batch could not be written
+        """
+        if hasattr(self, '_log_file') and self._log_file and not self._log_file.closed:
+            try:
+                self.flush()
+            finally:
+                if self._writer is not None:
+                    self._queue.put(None)  # Sentinel: drain and exit
+                    self._writer.join()
+                    self._writer = None
+                self._log_file.close()
+            self._raise_writer_error()
     
     def __del__(self):
         """Ensure log file is closed"""
@@ -320,6 +542,73 @@ def event_logger(log_path: Path):
         emitter.close()
 
 
+def prefilter_needles(*values: Optional[str]) -> tuple[bytes, ...]:
+    """
+    Build byte substrings that every raw line matching the given filter
+    values must contain.
+    
+    A line lacking any needle can be skipped without decoding it; lines
+    that contain them all still need the real (parsed) check. Values that
+    may be encoded differently by different JSON writers (non-ASCII) are
+    left out.
+    
+    Args:
+        values: Filter values (None entries are ignored)
+        
+    Returns:
+        Tuple of JSON-encoded needles
+    """
+    return tuple(
+        json.dumps(value).encode('ascii')
+        for value in values
+        if value and value.isascii()
+    )
+
+
+def iter_events(
+    log_path: Path,
+    event_type: Optional[str] = None,
+    step_id: Optional[str] = None,
+    level: Optional[str] = None
+) -> Iterator[dict]:
+    """
+    Lazily yield events from an events.jsonl file, one line at a time.
+    
+    When filters are given, lines that can't match are skipped with a
+    substring check on the raw bytes before any JSON decoding.
+    
+    Args:
+        log_path: Path to events.jsonl
+        event_type: Only yield events of this type
+        step_id: Only yield events for this step
+        level: Only yield events with this level
+        
+    Yields:
+        Event dicts in chronological order
+    """
+    if not log_path.exists():
+        return
+    
+    needles = prefilter_needles(event_type, step_id, level)
+    filtered = bool(event_type or step_id or level)
+    
+    with open(log_path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if needles and not all(needle in line for needle in needles):
+                continue
+            event = _loads(line)
+            if filtered and not (
+                (not event_type or event.get('type') == event_type)
+                and (not step_id or event.get('step') == step_id)
+                and (not level or event.get('level') == level)
+            ):
+                continue
+            yield event
+
+
 def read_events(log_path: Path) -> list[dict]:
     """
     Read all events from an events.jsonl file.
@@ -334,43 +623,81 @@ def read_events(log_path: Path) -> list[dict]:
         return []
     
     events = []
-    with open(log_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                events.append(json.loads(line))
+    with open(log_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return events  # mmap can't map an empty file
+        
+        # Map the whole log and slice lines out of it: the kernel pages it
+        # in lazily and there is no per-line buffered readline
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                end = mm.find(b'\n', start)
+                if end == -1:
+                    end = size
+                line = mm[start:end].strip()
+                if line:
+                    events.append(_loads(line))
+                start = end + 1
     
     return events
 
 
+def read_events_head(log_path: Path, n: int) -> list[dict]:
+    """
+    Read only the first n events from an events.jsonl file.
+    
+    Args:
+        log_path: Path to events.jsonl
+        n: Maximum number of events to return
+        
+    Returns:
+        Up to n event dicts in chronological order
+    """
+    return list(islice(iter_events(log_path), n))
+
+
+def count_events(log_path: Path) -> int:
+    """
+    Count events in an events.jsonl file without decoding them.
+    
+    Args:
+        log_path: Path to events.jsonl
+        
+    Returns:
+        Number of non-blank lines (0 if the file doesn't exist)
+    """
+    if not log_path.exists():
+        return 0
+    
+    with open(log_path, 'rb') as f:
+        return sum(1 for line in f if line.strip())
+
+
 def filter_events(
-    events: list[dict],
+    events: Iterable[dict],
     event_type: Optional[str] = None,
     step_id: Optional[str] = None,
     level: Optional[str] = None
-) -> list[dict]:
+) -> Iterator[dict]:
     """
-    Filter events by type, step, and/or level.
+    Lazily filter events by type, step, and/or level.
     
     Args:
-        events: List of event dicts
+        events: Iterable of event dicts (e.g. iter_events(path))
         event_type: Filter by event type (e.g., 'step.started')
         step_id: Filter by step identifier
         level: Filter by severity level (INFO/WARN/ERROR)
         
-    Returns:
-        Filtered list of events
+    Yields:
+        Matching events, in input order
     """
-    filtered = events
-    
-    if event_type:
-        filtered = [e for e in filtered if e.get('type') == event_type]
-    
-    if step_id:
-        filtered = [e for e in filtered if e.get('step') == step_id]
-    
-    if level:
-        filtered = [e for e in filtered if e.get('level') == level]
-    
-    return filtered
-
+    for e in events:
+        if event_type and e.get('type') != event_type:
+            continue
+        if step_id and e.get('step') != step_id:
+            continue
+        if level and e.get('level') != level:
+            continue
+        yield e
@@ -1,64 +1,203 @@
 """File Store with Safe Writes and Content Hashing
 
-Provides idempotent file operations with SHA256 hashing for integrity.
+Provides idempotent file operations with content hashing for integrity
+(BLAKE3 when available, else SHA256; see HASH_ALGO).
 All file writes go through this layer to ensure consistency and tracking.
 """
 
 import hashlib
+import os
+import stat
+import threading
+import warnings
+from collections import OrderedDict
 from pathlib import Path
-from typing import Literal, Union, Optional, TypedDict
+from typing import Iterator, Literal, Union, Optional, TypedDict
 import fcntl
 from contextlib import contextmanager
 
+try:
+    from blake3 import blake3 as _blake3  # SIMD tree hash, several GB/s per core
+
+    HASH_ALGO = "blake3"
+
+    def _new_hasher(data: bytes = b''):
+        """BLAKE3 hasher; inputs >= 128 KiB are hashed on several cores"""
+        if len(data) >= 128 * 1024:
+            return _blake3(data, max_threads=_blake3.AUTO)
+        return _blake3(data)
+except ImportError:
+    HASH_ALGO = "sha256"
+    _new_hasher = hashlib.sha256
+
+# Persistent lock file used by FileStore(cross_process=True), one per base_dir
+LOCK_FILENAME = ".filestore.lock"
+
+# Extended attribute holding "<mtime_ns>:<size>:<hash>" of files safe_write wrote
+HASH_XATTR = f"user.{HASH_ALGO}"
 
 def compute_sha256(content: Union[bytes, str]) -> str:
     """
     Compute SHA256 hash of content.
     
+    Deprecated: the file store hashes with compute_content_hash (see
+    HASH_ALGO); use hashlib.sha256 directly when SHA256 itself is needed.
+    
     Args:
         content: Bytes or string to hash
         
     Returns:
         Hexadecimal SHA256 hash string
     """
+    warnings.warn(
+        "compute_sha256 is deprecated; use compute_content_hash",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     if isinstance(content, str):
         content = content.encode('utf-8')
     
     return hashlib.sha256(content).hexdigest()
 
 
-class WriteResult(TypedDict):
-    """Result of a safe_write operation"""
-    path: Path
-    sha256: str
-    size_bytes: int
-    wrote: bool
-    reason: Literal["created", "nochange", "overwritten", "appended"]
+def compute_content_hash(content: Union[bytes, str]) -> str:
+    """
+    Compute the content hash used by the file store.
+    
+    BLAKE3 when the blake3 package is installed, SHA256 otherwise; HASH_ALGO
+    names the one in use and is recorded next to every persisted digest.
+    
+    Args:
+        content: Bytes or string to hash
+        
+    Returns:
+        64-character hexadecimal hash string
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    
+    return _new_hasher(content).hexdigest()
 
 
-@contextmanager
-def _file_lock(file_path: Path):
-    """
-    Context manager for exclusive file locking.
+def _file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """compute_content_hash of a file, streamed (no whole-file read)"""
+    with open(path, 'rb') as f:
+        if HASH_ALGO == "sha256":
+            # C-level loop straight from the fd into OpenSSL's SHA256
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        
+        h = _new_hasher()
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+        return h.hexdigest()
 
-    Prevents race conditions when multiple processes write to same file.
 
-    Args:
-        file_path: Path to lock
+def _write_all(fd: int, data: bytes):
+    """os.write until all of data is written (raw fd, no file object)"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
 
-    Yields:
-        Lock context (file is exclusively locked)
-    """
-    lock_path = file_path.with_suffix(file_path.suffix + '.lock')
-    lock_file = open(lock_path, 'w')
 
+def atomic_write(path: Path, data: bytes) -> os.stat_result:
+    """
+    Replace path's content with data atomically.
+    
+    Writes a sibling temp file (unique per process and thread) and renames
+    it over path, so readers see either the old or the new file, never a
+    torn one. An existing file's mode and owner are copied to the temp file
+    first; a symlink is followed so the link itself survives. Hardlinked
+    files are rewritten in place instead, since a rename would split them.
+    
+    Returns:
+        Stat of the written file (rename keeps its mtime and size)
+    """
+    path = Path(os.path.realpath(path))  # Write through symlinks
     try:
-        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)  # Exclusive lock
-        yield
+        old_st = os.stat(path)
+    except FileNotFoundError:
+        old_st = None
+    
+    if old_st is not None and old_st.st_nlink > 1:
+        fd = os.open(path, os.O_WRONLY | os.O_TRUNC)
+        try:
+            _write_all(fd, data)
+            return os.fstat(fd)
+        finally:
+            os.close(fd)
+    
+    tmp_path = path.with_name(f"{path.name}.tmp.{os.getpid()}.{threading.get_ident()}")
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+        try:
+            if old_st is not None:
+                _copy_ownership(fd, old_st)
+            _write_all(fd, data)
+            st = os.fstat(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+        return st
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _copy_ownership(fd: int, st: os.stat_result):
+    """Give the file open on fd the mode, and if permitted the owner, of st"""
+    new_st = os.fstat(fd)
+    if (new_st.st_uid, new_st.st_gid) != (st.st_uid, st.st_gid):
+        try:
+            os.fchown(fd, st.st_uid, st.st_gid)
+        except PermissionError:
+            pass  # Only root may give files away; keep ours
+    os.fchmod(fd, stat.S_IMODE(st.st_mode))  # After chown, which clears setuid
+
+
+def _append(path: Path, data: bytes) -> int:
+    """Append data to path (created if missing); returns the new file size"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o666)
+    try:
+        _write_all(fd, data)
+        return os.lseek(fd, 0, os.SEEK_CUR)  # Whole file, not just this chunk
     finally:
-        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)  # Unlock
-        lock_file.close()
-        lock_path.unlink(missing_ok=True)  # Clean up lock file
+        os.close(fd)
+
+
+def _set_hash_xattr(path: Path, st: os.stat_result, content_hash: str):
+    """Record content_hash on the file itself (best effort, Linux only)"""
+    value = f"{st.st_mtime_ns}:{st.st_size}:{content_hash}".encode()
+    try:
+        os.setxattr(path, HASH_XATTR, value)
+    except (AttributeError, OSError):
+        pass  # No xattr support on this platform/filesystem
+
+
+def _get_hash_xattr(path: Path, st: os.stat_result) -> Optional[str]:
+    """Hash recorded by _set_hash_xattr, if it still matches the file's stat"""
+    try:
+        value = os.getxattr(path, HASH_XATTR).decode()
+    except (AttributeError, OSError):
+        return None
+    
+    # An in-place edit keeps the xattr but moves mtime, so check it
+    try:
+        mtime_ns, size, content_hash = value.split(":", 2)
+        if int(mtime_ns) != st.st_mtime_ns or int(size) != st.st_size:
+            return None
+    except ValueError:
+        return None  # Not written by us
+    return content_hash
+
+
+class WriteResult(TypedDict):
+    """Result of a safe_write operation"""
+    path: Path
+    sha256: str  # Content hash; key kept for compatibility, algorithm in hash_algo
+    hash_algo: str
+    size_bytes: int
+    wrote: bool
+    reason: Literal["created", "nochange", "overwritten", "appended"]
 
 
 class FileStore:
@@ -66,21 +205,146 @@ class FileStore:
     Safe file storage with content hashing and duplicate detection.
     
     Features:
-    - Content-addressed storage (SHA256)
+    - Content-addressed storage (HASH_ALGO: BLAKE3 or SHA256)
     - Idempotent writes (won't rewrite same content)
     - Parent directory creation
-    - Exclusive locking for parallel safety
+    - Optional exclusive locking for multi-process safety
     - Multiple write modes (create_new, overwrite, append)
     """
     
-    def __init__(self, base_dir: Path = Path(".")):
+    # Maximum number of on-disk file hashes remembered per store
+    HASH_CACHE_SIZE = 1024
+    # Existing files up to this size are compared byte-for-byte, not hashed
+    SMALL_FILE_BYTES = 256
+    
+    def __init__(self, base_dir: Path = Path("."), cross_process: bool = False):
         """
         Initialize file store.
         
         Args:
             base_dir: Base directory for all file operations
+            cross_process: Also serialize safe_write calls across processes
+                           with an flock on a persistent lock file in
+                           base_dir. Threads are always serialized per path.
         """
         self.base_dir = base_dir
+        self.cross_process = cross_process
+        # Per-path write locks; _locks_guard protects the dict itself
+        self._locks: dict[Path, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._lock_file = None
+        self._flock_guard = threading.Lock()
+        # (path, mtime_ns, size) -> content hash of files this store has seen
+        self._hash_cache: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        # Directories this store has already created (see _write_in_dir)
+        self._known_dirs: set[Path] = set()
+    
+    def _write_in_dir(self, write, path: Path, data: bytes):
+        """
+        Call write(path, data), recreating path's parent once if it vanished.
+        
+        Parents in _known_dirs are not re-checked before each write, so a
+        directory removed behind the store's back shows up here as
+        FileNotFoundError.
+        """
+        try:
+            return write(path, data)
+        except FileNotFoundError:
+            parent = path.parent
+            self._known_dirs.discard(parent)
+            parent.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(parent)
+            return write(path, data)
+    
+    def _remember_hash(self, path: Path, st: os.stat_result, content_hash: str):
+        """Record the hash of a file as of the given stat"""
+        cache = self._hash_cache
+        cache[(str(path), st.st_mtime_ns, st.st_size)] = content_hash
+        if len(cache) > self.HASH_CACHE_SIZE:
+            cache.popitem(last=False)  # Evict least recently used
+    
+    def _file_hash(self, path: Path, st: os.stat_result) -> str:
+        """Content hash of a file, reused while its mtime and size are unchanged"""
+        key = (str(path), st.st_mtime_ns, st.st_size)
+        cached = self._hash_cache.get(key)
+        if cached is not None:
+            self._hash_cache.move_to_end(key)
+            return cached
+        
+        file_hash = _file_digest(path)
+        self._remember_hash(path, st, file_hash)
+        return file_hash
+    
+    def _same_content(self, path: Path, content_bytes: bytes, content_hash: str) -> bool:
+        """
+        Whether the file at path already holds content_bytes.
+        
+        Cheapest test first: size, then a remembered hash, then (for small
+        files) a direct byte comparison, then the hash xattr left by an
+        earlier write, and only then a streamed hash.
+        """
+        st = path.stat()
+        if st.st_size != len(content_bytes):
+            return False
+        
+        cached = self._hash_cache.get((str(path), st.st_mtime_ns, st.st_size))
+        if cached is not None:
+            return cached == content_hash
+        
+        if st.st_size <= self.SMALL_FILE_BYTES:
+            # Reading a few hundred bytes beats hashing them
+            with open(path, 'rb') as f:
+                return f.read() == content_bytes
+        
+        stored = _get_hash_xattr(path, st)
+        if stored is not None:
+            self._remember_hash(path, st, stored)
+            return stored == content_hash
+        
+        return self._file_hash(path, st) == content_hash
+    
+    def _path_lock(self, path: Path) -> threading.Lock:
+        """In-process lock for one target path, created on first use"""
+        lock = self._locks.get(path)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(path, threading.Lock())
+        return lock
+    
+    @contextmanager
+    def _locked(self, path: Path):
+        """
+        Hold the write lock for path.
+        
+        Threads writing the same path exclude each other; different paths
+        proceed in parallel. With cross_process, an flock on the store's
+        lock file also excludes other processes. The target file itself
+        can't carry the flock because atomic_write replaces its inode.
+        """
+        with self._path_lock(path):
+            if not self.cross_process:
+                yield
+                return
+            
+            # Threads sharing one open lock file don't exclude each other
+            with self._flock_guard:
+                if self._lock_file is None:
+                    self.base_dir.mkdir(parents=True, exist_ok=True)
+                    self._lock_file = os.open(
+                        self.base_dir / LOCK_FILENAME, os.O_RDWR | os.O_CREAT, 0o666
+                    )
+                
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)  # Exclusive lock
+                try:
+                    yield
+                finally:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)  # Unlock
+    
+    def close(self):
+        """Release the persistent lock file, if one was opened"""
+        if self._lock_file is not None:
+            os.close(self._lock_file)
+            self._lock_file = None
     
     def safe_write(
         self,
@@ -108,7 +372,8 @@ class FileStore:
         Returns:
             WriteResult dict with keys:
                 - path: Full path to written file
-                - sha256: Content hash
+                - sha256: Content hash (compute_content_hash)
+                - hash_algo: Algorithm that produced sha256 (HASH_ALGO)
                 - size_bytes: File size
                 - wrote: Whether data was written (False if content unchanged)
                 - reason: Why file was/wasn't written ("created", "nochange", "overwritten", "appended")
@@ -130,24 +395,27 @@ class FileStore:
             content_bytes = content
 
         # Compute hash before writing
-        content_hash = compute_sha256(content_bytes)
+        content_hash = compute_content_hash(content_bytes)
 
         # Track write status
         wrote = False
         reason: Literal["created", "nochange", "overwritten", "appended"] = "created"
+        final_size = len(content_bytes)
 
-        # Create parent directories
-        full_path.parent.mkdir(parents=True, exist_ok=True)
+        # Create parent directories (once per directory)
+        parent = full_path.parent
+        if parent not in self._known_dirs:
+            parent.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(parent)
 
-        # Lock file for exclusive access
-        with _file_lock(full_path):
+        # Exclusive access to this path
+        with self._locked(full_path):
             file_existed = full_path.exists()
 
             # Check mode constraints
             if mode == "create_new" and file_existed:
                 # Check if content is same (idempotent)
-                existing_hash = compute_sha256(full_path.read_bytes())
-                if existing_hash == content_hash:
+                if self._same_content(full_path, content_bytes, content_hash):
                     # Same content - idempotent, return success
                     wrote = False
                     reason = "nochange"
@@ -158,33 +426,33 @@ class FileStore:
 
             # Duplicate detection (skip write if content unchanged)
             elif mode == "overwrite" and file_existed:
-                existing_hash = compute_sha256(full_path.read_bytes())
-                if existing_hash == content_hash:
+                if self._same_content(full_path, content_bytes, content_hash):
                     # Content unchanged - skip write
                     wrote = False
                     reason = "nochange"
                 else:
                     # Content changed - overwrite
-                    with open(full_path, 'wb') as f:
-                        f.write(content_bytes)
+                    st = atomic_write(full_path, content_bytes)
                     wrote = True
                     reason = "overwritten"
 
             # Perform write for other cases
             elif mode == "append":
-                with open(full_path, 'ab') as f:
-                    f.write(content_bytes)
+                final_size = self._write_in_dir(_append, full_path, content_bytes)
                 wrote = True
                 reason = "appended"
 
             else:  # create_new (file doesn't exist) or overwrite (file doesn't exist)
-                with open(full_path, 'wb') as f:
-                    f.write(content_bytes)
+                st = self._write_in_dir(atomic_write, full_path, content_bytes)
                 wrote = True
                 reason = "created" if not file_existed else "overwritten"
 
-        # Get final size
-        final_size = full_path.stat().st_size
+        if wrote and reason != "appended":
+            # The file now holds exactly content_bytes
+            self._remember_hash(full_path, st, content_hash)
+            if st.st_size > self.SMALL_FILE_BYTES:
+                # Lets other stores/processes skip rehashing it
+                _set_hash_xattr(full_path, st, content_hash)
 
         # Emit file.written event if emitter provided
         if emitter and job_id and step_id:
@@ -201,6 +469,7 @@ class FileStore:
         return WriteResult(
             path=full_path,
             sha256=content_hash,
+            hash_algo=HASH_ALGO,
             size_bytes=final_size,
             wrote=wrote,
             reason=reason
@@ -232,6 +501,40 @@ class FileStore:
         
         return (self.base_dir / path).exists()
     
+    def iter_files(self, pattern: str = "**/*") -> Iterator[Path]:
+        """
+        Lazily yield files matching pattern.
+        
+        The default "**/*" (every file) walks the tree with os.scandir,
+        whose DirEntry type checks usually need no extra stat; other
+        patterns go through Path.glob.
+        
+        Args:
+            pattern: Glob pattern (default: all files)
+            
+        Yields:
+            Matching file paths (relative to base_dir)
+        """
+        if pattern != "**/*":
+            for p in self.base_dir.glob(pattern):
+                if p.is_file() and p.name != LOCK_FILENAME:
+                    yield p.relative_to(self.base_dir)
+            return
+        
+        prefix_len = len(os.path.join(str(self.base_dir), ""))
+        stack = [str(self.base_dir)]
+        while stack:
+            try:
+                it = os.scandir(stack.pop())
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            with it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file() and entry.name != LOCK_FILENAME:
+                        yield Path(entry.path[prefix_len:])
+    
     def list_files(self, pattern: str = "**/*") -> list[Path]:
         """
         List files matching pattern.
@@ -242,11 +545,7 @@ class FileStore:
         Returns:
             List of matching file paths (relative to base_dir)
         """
-        return [
-            p.relative_to(self.base_dir)
-            for p in self.base_dir.glob(pattern)
-            if p.is_file()
-        ]
+        return list(self.iter_files(pattern))
 
 
 # Global instance for convenient access
@@ -12,11 +12,77 @@ runs/<job_id>/
 """
 
 import json
+from operator import attrgetter
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Union
 from .models import Job, JobSpec, JobStatus, Artifact
-from .filestore import compute_sha256
+from .filestore import FileStore, atomic_write, compute_content_hash
+from .cache import read_cache, write_cache
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps_manifest(manifest: dict) -> bytes:
+        """Indented manifest JSON; datetimes become ISO 8601 (orjson C encoder)"""
+        return orjson.dumps(manifest, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _loads = json.loads
+
+    def _isoformat(obj):
+        if isinstance(obj, datetime):
+            return obj.isoformat()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def _dumps_manifest(manifest: dict) -> bytes:
+        """Indented manifest JSON; datetimes become ISO 8601 (stdlib fallback)"""
+        return json.dumps(manifest, indent=2, default=_isoformat).encode('utf-8')
+
+
+# One C-level call per object instead of one attribute lookup per field
+_artifact_fields = attrgetter("path", "sha256", "hash_algo", "size_bytes", "media_type", "created_at")
+_step_fields = attrgetter("status", "duration_s", "provider_calls", "artifacts")
+_failure_fields = attrgetter("kind", "step", "message", "timestamp")
+
+
+def _artifacts_to_list(arts) -> list[dict]:
+    """Manifest "files" entries for a list of Artifacts"""
+    return [
+        {
+            "path": str(path),
+            "sha256": sha256,
+            "hash_algo": hash_algo,
+            "size_bytes": size_bytes,
+            "media_type": media_type,
+            "created_at": created_at,
+        }
+        for path, sha256, hash_algo, size_bytes, media_type, created_at
+        in map(_artifact_fields, arts)
+    ]
+
+
+def _steps_to_dict(steps) -> dict:
+    """Manifest "steps" entries for a step_id -> StepResult mapping"""
+    return {
+        step_id: {
+            "status": status,
+            "duration_s": duration_s,
+            "provider_calls": provider_calls,
+            "artifacts": len(artifacts),
+        }
+        for step_id, (status, duration_s, provider_calls, artifacts)
+        in zip(steps.keys(), map(_step_fields, steps.values()))
+    }
+
+
+def _failures_to_list(fs) -> list[dict]:
+    """Manifest "failures" entries for a list of Failures"""
+    return [
+        {"kind": kind, "step": step, "message": message, "timestamp": timestamp}
+        for kind, step, message, timestamp in map(_failure_fields, fs)
+    ]
 
 
 class RunManager:
@@ -41,6 +107,14 @@ class RunManager:
         self.job_id = job_id
         self.run_dir = runs_base / job_id
         self.manifest_path = self.run_dir / "manifest.json"
+        self._filestore: Optional[FileStore] = None
+    
+    @property
+    def filestore(self) -> FileStore:
+        """FileStore rooted at this run's outputs/ (created on first use)"""
+        if self._filestore is None:
+            self._filestore = FileStore(self.run_dir / "outputs")
+        return self._filestore
     
     def create_structure(self, spec: JobSpec) -> Path:
         """
@@ -62,7 +136,7 @@ class RunManager:
         # Write initial manifest
         manifest = {
             "job_id": self.job_id,
-            "started_at": datetime.utcnow().isoformat(),
+            "started_at": datetime.utcnow(),
             "project": spec.project,
             "task_description": spec.task_description,
             "provider": spec.provider,
@@ -96,41 +170,16 @@ class RunManager:
         """
         manifest = {
             "job_id": job.job_id,
-            "started_at": job.started_at.isoformat(),
-            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
             "project": job.spec.project,
             "task_description": job.spec.task_description,
             "provider": job.spec.provider,
             "status": job.status.value,
             "duration_s": job.duration_s,
-            "files": [
-                {
-                    "path": str(art.path),
-                    "sha256": art.sha256,
-                    "size_bytes": art.size_bytes,
-                    "media_type": art.media_type,
-                    "created_at": art.created_at.isoformat(),
-                }
-                for art in (artifacts or job.artifacts)
-            ],
-            "steps": {
-                step_id: {
-                    "status": result.status,
-                    "duration_s": result.duration_s,
-                    "provider_calls": result.provider_calls,
-                    "artifacts": len(result.artifacts),
-                }
-                for step_id, result in job.steps.items()
-            },
-            "failures": [
-                {
-                    "kind": f.kind,
-                    "step": f.step,
-                    "message": f.message,
-                    "timestamp": f.timestamp.isoformat(),
-                }
-                for f in job.failures
-            ] if job.failures else [],
+            "files": _artifacts_to_list(artifacts or job.artifacts),
+            "steps": _steps_to_dict(job.steps),
+            "failures": _failures_to_list(job.failures),
             "completed_steps": completed_steps or [],
             "pending_steps": pending_steps or [],
         }
@@ -138,9 +187,13 @@ class RunManager:
         self._write_manifest(manifest)
     
     def _write_manifest(self, manifest: dict):
-        """Write manifest to disk"""
-        with open(self.manifest_path, 'w') as f:
-            json.dump(manifest, f, indent=2)
+        """
+        Write manifest to disk atomically (see atomic_write).
+        
+        Datetime values are serialized here rather than when the manifest
+        dict is built.
+        """
+        atomic_write(self.manifest_path, _dumps_manifest(manifest))
     
     def read_manifest(self) -> Optional[dict]:
         """
@@ -152,8 +205,8 @@ class RunManager:
         if not self.manifest_path.exists():
             return None
         
-        with open(self.manifest_path, 'r') as f:
-            return json.load(f)
+        with open(self.manifest_path, 'rb') as f:
+            return _loads(f.read())
     
     def add_artifact(
         self,
@@ -172,22 +225,15 @@ class RunManager:
         Returns:
             Artifact object with path and hash
         """
-        # Write to outputs/
-        output_path = self.run_dir / "outputs" / relative_path
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        if isinstance(content, str):
-            content_bytes = content.encode('utf-8')
-        else:
-            content_bytes = content
-        
-        output_path.write_bytes(content_bytes)
+        # Write to outputs/ (hashes once, skips unchanged content)
+        result = self.filestore.safe_write(relative_path, content, mode="overwrite")
         
         # Create artifact record
         artifact = Artifact(
             path=str(relative_path),
-            sha256=compute_sha256(content_bytes),
-            size_bytes=len(content_bytes),
+            sha256=result["sha256"],
+            hash_algo=result["hash_algo"],
+            size_bytes=result["size_bytes"],
             media_type=media_type,
         )
         
@@ -203,7 +249,7 @@ class RunManager:
         Returns:
             Cache file path in .cache/
         """
-        content_hash = compute_sha256(content)
+        content_hash = compute_content_hash(content)
         return str(self.run_dir / ".cache" / f"{content_hash}.json")
     
     def cache_get(self, key: str) -> Optional[str]:
@@ -216,16 +262,8 @@ class RunManager:
         Returns:
             Cached response or None if not found
         """
-        cache_path = Path(key)
-        if not cache_path.exists():
-            return None
-        
-        try:
-            with open(cache_path, 'r') as f:
-                data = json.load(f)
-                return data.get('response')
-        except:
-            return None
+        data = read_cache(Path(key))
+        return data.get('response') if isinstance(data, dict) else None
     
     def cache_put(self, key: str, response: str):
         """
@@ -235,14 +273,11 @@ class RunManager:
             key: Cache key from get_cache_key()
             response: LLM response to cache
         """
-        cache_path = Path(key)
-        cache_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(cache_path, 'w') as f:
-            json.dump({
-                'response': response,
-                'cached_at': datetime.utcnow().isoformat(),
-            }, f)
+        # Compact JSON, atomically replaced (see write_cache)
+        write_cache(Path(key), {
+            'response': response,
+            'cached_at': datetime.utcnow().isoformat(),
+        })
 
 
 def create_run(job_id: str, spec: JobSpec) -> RunManager:
@@ -49,6 +49,7 @@ class Artifact(BaseModel):
     Attributes:
         path: Relative path to artifact (e.g., 'src/main.py')
         sha256: Content hash for integrity verification
+        hash_algo: Algorithm that produced sha256 ('sha256' or 'blake3')
         size_bytes: File size in bytes
         media_type: MIME type (e.g., 'text/x-python', 'application/json')
         created_at: Timestamp when artifact was created
@@ -57,6 +58,7 @@ class Artifact(BaseModel):
     sha256: str
     size_bytes: int
     media_type: str = "text/plain"
+    hash_algo: str = "sha256"
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     model_config = ConfigDict(
@@ -5,6 +5,7 @@ Architecture: architect → parallel{builder, docs} → qa
 """
 
 import asyncio
+import time
 import uuid
 import hashlib
 from pathlib import Path
@@ -63,7 +64,8 @@ class DAGOrchestrator:
         
         # Setup event logging
         events_path = run_dir / "events.jsonl"
-        self.events = EventEmitter(events_path)
+        self.events = EventEmitter(events_path, background=True)
+        self.events.bind_job(self.job_id)
         
         # Setup file store
         self.filestore = FileStore(run_dir / "outputs")
@@ -142,6 +144,7 @@ class DAGOrchestrator:
             job.failures.append(failure)
 
             # Derive completed/pending step lists for manifest
+            self.events.flush(wait=True)
             completed_events = read_completed_steps(events_path)
             completed_steps = sorted(completed_events)
             if dag is not None:
@@ -216,10 +219,10 @@ class DAGOrchestrator:
             provider_info["model"]
         )
 
-        start = datetime.utcnow()
+        start = time.monotonic()
         try:
             response = provider.generate(messages, **PROVIDER_OPTIONS)
-            duration = (datetime.utcnow() - start).total_seconds()
+            duration = time.monotonic() - start
 
             # Emit llm.response event (success)
             events.llm_response(
@@ -238,7 +241,7 @@ class DAGOrchestrator:
                 duration
             )
         except Exception as e:
-            duration = (datetime.utcnow() - start).total_seconds()
+            duration = time.monotonic() - start
 
             # Emit llm.response event (failure)
             events.llm_response(
@@ -405,6 +408,7 @@ Include: FastAPI, SQLAlchemy, Pydantic models, endpoints, error handling."""
         artifact = Artifact(
             path=f"{spec.project}/main.py",
             sha256=write_result["sha256"],
+            hash_algo=write_result["hash_algo"],
             size_bytes=write_result["size_bytes"],
             media_type="text/x-python"
         )
@@ -474,6 +478,7 @@ Include: FastAPI, SQLAlchemy, Pydantic models, endpoints, error handling."""
         artifact = Artifact(
             path=f"{spec.project}/README.md",
             sha256=write_result["sha256"],
+            hash_algo=write_result["hash_algo"],
             size_bytes=write_result["size_bytes"],
             media_type="text/markdown"
         )
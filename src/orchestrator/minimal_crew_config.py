@@ -1,6 +1,6 @@
 """Minimal 4-Agent Crew Configuration for Faster Iteration"""
 from crewai import Agent, Task, Crew, Process
-from config import get_llm_backend
+from config import get_shared_llm_backend
 from src.agents.architect_agent import ArchitectAgent
 from src.tools.production_tools import (
     write_file, read_file, validate_python_code,
@@ -67,7 +67,7 @@ Workflow:
 NEVER put code in Final Answer - put it in write_file content parameter!""",
             tools=[write_file, read_file, validate_python_code, 
                    create_project_structure, generate_requirements],
-            llm=get_llm_backend(),
+            llm=get_shared_llm_backend(),
             verbose=True,
             allow_delegation=False
         )
@@ -91,7 +91,7 @@ NEVER put code in Final Answer - put it in write_file content parameter!""",
             
             You provide clear, actionable feedback on issues found.""",
             tools=[read_file, test_code, validate_python_code, list_directory, score_code_tool],
-            llm=get_llm_backend(),
+            llm=get_shared_llm_backend(),
             verbose=True,
             allow_delegation=False
         )
@@ -118,7 +118,7 @@ NEVER put code in Final Answer - put it in write_file content parameter!""",
             
             You also provide final recommendations for production deployment.""",
             tools=[write_file, read_file, get_current_date, list_directory],
-            llm=get_llm_backend(),
+            llm=get_shared_llm_backend(),
             verbose=True,
             allow_delegation=False
         )
@@ -33,9 +33,27 @@ class LocalHuggingFaceEmbeddings:
             input: List of texts to embed
 
         Returns:
-            List of embedding vectors (floats)
+            List of L2-normalized embedding vectors (floats), same as encode()
         """
-        embeddings = self.model.encode(input, convert_to_numpy=True)
+        return self.encode(input)
+
+    def encode(self, texts: list[str], batch_size: int = 64) -> list[list[float]]:
+        """
+        Batch-embed texts ahead of a vector-store insert.
+
+        Args:
+            texts: List of texts to embed
+            batch_size: Texts per forward pass
+
+        Returns:
+            List of L2-normalized embedding vectors (floats)
+        """
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
         return embeddings.tolist()
 
 
@@ -11,22 +11,32 @@ class VectorMemory:
     allowing for better context awareness across tasks.
     """
 
-    def __init__(self, collection_name: str = "orchestrator", persist_dir: str = "./memory"):
+    def __init__(
+        self,
+        collection_name: str = "orchestrator",
+        persist_dir: str = "./memory",
+        embedding_function=None
+    ):
         """
         Initialize vector memory with ChromaDB persistent storage.
 
         Args:
             collection_name: Name of the collection for this orchestrator instance
             persist_dir: Directory for persistent storage (default: ./memory)
+            embedding_function: Optional ChromaDB embedding function for documents
+                and queries (default: ChromaDB's built-in model). Pass the same
+                model that produces any precomputed save_batch embeddings.
         """
         # Create persist directory if it doesn't exist
         os.makedirs(persist_dir, exist_ok=True)
 
         # Use PersistentClient for data persistence across runs
         self.client = chromadb.PersistentClient(path=persist_dir)
-        self.collection = self.client.get_or_create_collection(collection_name)
+        self.embedding_function = embedding_function
+        self.collection = self._get_collection(collection_name)
         self.collection_name = collection_name
         self.persist_dir = persist_dir
+        self._count_cache: Optional[int] = None  # Filled on first count()
     
     def save(self, key: str, content: str, metadata: Optional[Dict] = None):
         """
@@ -42,6 +52,47 @@ class VectorMemory:
             documents=[content],
             metadatas=[metadata or {}]
         )
+        self._count_cache = None  # Upsert may have replaced an existing key
+    
+    def save_batch(
+        self,
+        keys: List[str],
+        contents: List[str],
+        metadatas: Optional[List[Dict]] = None,
+        embeddings: Optional[List[List[float]]] = None
+    ):
+        """
+        Store many documents in a single ChromaDB call.
+        
+        One upsert per batch instead of one per document amortizes the
+        per-call SQLite transaction cost during bulk ingest.
+        
+        Args:
+            keys: Unique identifiers, one per document
+            contents: Text contents, aligned with keys
+            metadatas: Optional metadata dicts, aligned with keys
+            embeddings: Optional precomputed vectors, aligned with keys, from
+                this memory's embedding_function
+        """
+        if not keys:
+            return
+        
+        params = {
+            "ids": list(keys),
+            "documents": list(contents),
+            "metadatas": [m or {} for m in metadatas] if metadatas else [{} for _ in keys]
+        }
+        if embeddings is not None:
+            params["embeddings"] = embeddings
+        
+        self.collection.upsert(**params)
+        self._count_cache = None  # Upsert may have replaced existing keys
+    
+    @property
+    def max_batch_size(self) -> int:
+        """Largest batch the underlying client accepts in one call"""
+        get_max = getattr(self.client, "get_max_batch_size", None)
+        return get_max() if get_max else 5461  # ChromaDB's SQLite default
     
     def load(self, key: str) -> Optional[str]:
         """
@@ -95,11 +146,27 @@ class VectorMemory:
     def clear(self):
         """Clear all memory in this collection"""
         self.client.delete_collection(self.collection_name)
-        self.collection = self.client.get_or_create_collection(self.collection_name)
+        self.collection = self._get_collection(self.collection_name)
+        self._count_cache = 0
+    
+    def _get_collection(self, name: str):
+        """Open (or create) a collection embedding with self.embedding_function"""
+        if self.embedding_function is None:
+            return self.client.get_or_create_collection(name)
+        return self.client.get_or_create_collection(
+            name, embedding_function=self.embedding_function
+        )
     
-    def count(self) -> int:
-        """Get count of stored items"""
-        return self.collection.count()
+    def count(self, refresh: bool = False) -> int:
+        """
+        Get count of stored items.
+        
+        The count is cached until the next save/save_batch (which may add
+        or replace keys); pass refresh=True to pick up external writes.
+        """
+        if refresh or self._count_cache is None:
+            self._count_cache = self.collection.count()
+        return self._count_cache
     
     def __repr__(self):
         return f"VectorMemory(collection='{self.collection_name}', persist_dir='{self.persist_dir}', count={self.count()})"
@@ -5,7 +5,7 @@ from pathlib import Path
 
 import pytest
 
-from src.core.cache import compute_cache_key
+from src.core.cache import compute_cache_key, get_code_version
 from src.core.models import JobSpec
 from src.orchestrator.dag_orchestrator import DAGOrchestrator
 
@@ -28,6 +28,44 @@ def test_cache_key_deterministic():
     assert key_one != key_diff
 
 
+def test_cache_key_independent_of_json_backend(monkeypatch):
+    """Keys are identical with and without orjson for non-ASCII and float inputs."""
+    import importlib
+    import sys
+    from datetime import datetime
+
+    from src.core import cache
+
+    provider = {"name": "ollama", "model": "llama3", "opts": {"temperature": 0.1}}
+    inputs = {
+        "task": "résumé ✓ 東京",
+        "floats": [1e20, 0.00001, 1.5, -0.0],
+        "when": datetime(2024, 1, 2, 3, 4, 5),
+    }
+
+    with_default = cache.compute_cache_key(provider, "architect", inputs, code_version="abc")
+    try:
+        monkeypatch.setitem(sys.modules, "orjson", None)  # Import raises ImportError
+        importlib.reload(cache)
+        without_orjson = cache.compute_cache_key(provider, "architect", inputs, code_version="abc")
+    finally:
+        monkeypatch.undo()
+        importlib.reload(cache)
+
+    assert with_default == without_orjson
+
+
+def test_code_version_computed_once():
+    """get_code_version is memoized for the process lifetime."""
+    get_code_version.cache_clear()
+
+    first = get_code_version()
+    second = get_code_version()
+
+    assert first == second
+    assert get_code_version.cache_info().misses == 1
+
+
 class DummyProvider:
     """Simple provider mock that records generate() invocations."""
 
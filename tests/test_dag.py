@@ -5,7 +5,7 @@ import asyncio
 from datetime import datetime
 
 from src.core.dag import DAG, DAGNode, run_dag, topological_sort
-from src.core.events import EventEmitter
+from src.core.events import EventEmitter, read_events
 from src.core.models import StepResult
 
 
@@ -47,6 +47,17 @@ class TestDAG:
         with pytest.raises(ValueError, match="cycle"):
             dag.validate()
     
+    def test_validate_deep_chain(self):
+        """Validation handles chains deeper than the recursion limit"""
+        dag = DAG()
+        depth = 5000
+        for i in range(depth):
+            needs = [f"n{i + 1}"] if i < depth - 1 else []
+            dag.add_node(DAGNode(id=f"n{i}", fn=lambda ctx, deps: None, needs=needs))
+        
+        # Should not raise RecursionError
+        dag.validate()
+    
     def test_validate_valid_dag(self):
         """Valid DAG passes validation"""
         dag = DAG()
@@ -78,6 +89,38 @@ class TestDAG:
         ready = dag.get_ready_nodes(completed={"a"})
         assert len(ready) == 2
         assert {n.id for n in ready} == {"b", "c"}
+    
+    def test_mark_complete_returns_unblocked_nodes(self):
+        """mark_complete reports a node only once all its deps are complete"""
+        dag = DAG()
+        dag.add_node(DAGNode(id="a", fn=lambda ctx, deps: None, needs=[]))
+        dag.add_node(DAGNode(id="b", fn=lambda ctx, deps: None, needs=["a"]))
+        dag.add_node(DAGNode(id="c", fn=lambda ctx, deps: None, needs=["a"]))
+        dag.add_node(DAGNode(id="d", fn=lambda ctx, deps: None, needs=["b", "c"]))
+        dag.validate()
+        
+        assert set(dag.mark_complete("a")) == {"b", "c"}
+        assert dag.mark_complete("b") == []
+        assert dag.mark_complete("c") == ["d"]
+    
+    def test_same_shape_reuses_validation(self):
+        """DAGs built from the same templates share one validated plan"""
+        def build(fn):
+            dag = DAG()
+            dag.add_node(DAGNode(id="a", fn=fn, needs=[]))
+            dag.add_node(DAGNode(id="b", fn=fn, needs=["a"]))
+            return dag
+        
+        first = build(lambda ctx, deps: 1)
+        second = build(lambda ctx, deps: 2)
+        first.validate()
+        second.validate()
+        
+        assert first._dependents is second._dependents
+        # Counters stay per-DAG so concurrent runs don't interfere
+        assert first._pending_deps is not second._pending_deps
+        assert first.mark_complete("a") == ["b"]
+        assert second._pending_deps["b"] == 1
 
 
 class TestTopologicalSort:
@@ -182,6 +225,34 @@ class TestRunDAG:
         time_diff = abs((execution_times["b"] - execution_times["c"]).total_seconds())
         assert time_diff < 0.1, f"b and c should run in parallel, but diff was {time_diff}s"
     
+    async def test_downstream_starts_before_slow_sibling_finishes(self, tmp_path):
+        """A node starts as soon as its own deps finish, not its whole wave"""
+        finished = []
+        
+        async def fast(ctx, deps):
+            finished.append("fast")
+            return {}
+        
+        async def slow(ctx, deps):
+            await asyncio.sleep(0.2)
+            finished.append("slow")
+            return {}
+        
+        async def after_fast(ctx, deps):
+            finished.append("after_fast")
+            return {}
+        
+        dag = DAG()
+        dag.add_node(DAGNode(id="fast", fn=fast, needs=[]))
+        dag.add_node(DAGNode(id="slow", fn=slow, needs=[]))
+        dag.add_node(DAGNode(id="after_fast", fn=after_fast, needs=["fast"]))
+        
+        events = EventEmitter(tmp_path / "events.jsonl")
+        await run_dag(dag, "test", {}, events, concurrency=4)
+        events.close()
+        
+        assert finished == ["fast", "after_fast", "slow"]
+    
     async def test_dependency_results_passed(self, tmp_path):
         """Dependency results are passed to downstream nodes"""
         async def step_a(ctx, deps):
@@ -222,6 +293,40 @@ class TestRunDAG:
         
         events.close()
     
+    async def test_failure_cancels_in_flight_siblings(self, tmp_path):
+        """First failure cancels siblings that are still running"""
+        cancelled = False
+        
+        async def step_fail(ctx, deps):
+            raise ValueError("Intentional failure")
+        
+        async def step_slow(ctx, deps):
+            nonlocal cancelled
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            return {}
+        
+        dag = DAG()
+        dag.add_node(DAGNode(id="fail", fn=step_fail, needs=[]))
+        dag.add_node(DAGNode(id="slow", fn=step_slow, needs=[]))
+        
+        events = EventEmitter(tmp_path / "events.jsonl")
+        
+        with pytest.raises(ValueError, match="Intentional failure"):
+            await asyncio.wait_for(run_dag(dag, "test", {}, events), timeout=2)
+        
+        events.close()
+        assert cancelled
+        
+        terminal = {
+            e["step"]: e["type"] for e in read_events(tmp_path / "events.jsonl")
+            if e["type"] != "step.started"
+        }
+        assert terminal == {"fail": "step.failed", "slow": "step.cancelled"}
+    
     async def test_concurrency_limit(self, tmp_path):
         """Concurrency limit is respected"""
         active_count = 0
@@ -0,0 +1,172 @@
+"""Tests for EventEmitter - Batching, Background Writer and Log Reading"""
+
+import json
+import re
+import threading
+import pytest
+from pathlib import Path
+
+from src.core.events import EventEmitter, count_events, iter_events, read_events_head
+
+
+def _lines(path: Path) -> list[dict]:
+    """Parse every line of an events.jsonl file"""
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestBackgroundWriter:
+    """Test the background writer thread and concurrent emitters"""
+
+    @pytest.mark.skipif(not Path("/dev/full").exists(), reason="needs /dev/full")
+    def test_write_error_surfaces_instead_of_hanging(self):
+        """A failed background write is re-raised by flush(wait=True) and close()"""
+        events = EventEmitter(Path("/dev/full"), background=True)
+        events.job_failed("job", "boom", 1.0)  # Flushed right away; ENOSPC
+
+        with pytest.raises(OSError):
+            events.flush(wait=True)
+        with pytest.raises(OSError):
+            events.close()
+        assert events._writer is None
+
+    def test_concurrent_emits_not_lost(self, tmp_path):
+        """Events emitted from several threads while flushing all reach the log"""
+        events = EventEmitter(tmp_path / "events.jsonl")
+
+        def emit_many(step_id):
+            for i in range(500):
+                events.step_started("job", step_id, [])
+                if i % 7 == 0:
+                    events.flush()
+
+        threads = [threading.Thread(target=emit_many, args=(f"s{n}",)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        events.close()
+
+        assert len(_lines(tmp_path / "events.jsonl")) == 8 * 500
+
+
+class TestRawFastPath:
+    """Test that emit_raw events match the emit() encoding"""
+
+    @pytest.mark.parametrize("job_id,step_id,cache_key", [
+        ("job_1", "architect", "abc123"),
+        ('job "quoted"\\', 'stép ✓ "x"', "clé\n\t"),
+    ])
+    def test_raw_events_match_emit_path(self, tmp_path, job_id, step_id, cache_key):
+        """Bound (raw) and unbound (emit) emitters write the same events"""
+        def emit_all(events):
+            events.step_started(job_id, step_id, [])
+            events.step_started(job_id, step_id, ["a", 'b"ü'])
+            events.cache_hit(job_id, step_id, cache_key)
+            events.cache_miss(job_id, step_id, cache_key)
+            events.close()
+
+        raw = EventEmitter(tmp_path / "raw.jsonl")
+        raw.bind_job(job_id)
+        emit_all(raw)
+        emit_all(EventEmitter(tmp_path / "emit.jsonl"))
+
+        raw_events = _lines(tmp_path / "raw.jsonl")
+        emit_events = _lines(tmp_path / "emit.jsonl")
+        for event in raw_events + emit_events:
+            assert event.pop("ts").endswith("Z")
+
+        assert raw_events == emit_events
+        assert raw_events[0] == {
+            "type": "step.started", "level": "INFO", "job_id": job_id, "step": step_id,
+        }
+
+
+class TestEmitterBatching:
+    """Test buffering, flush triggers and event encoding"""
+
+    @pytest.fixture
+    def events(self, tmp_path):
+        emitter = EventEmitter(tmp_path / "events.jsonl")
+        yield emitter
+        emitter.close()
+
+    def test_info_events_buffered_until_flush(self, events):
+        """Plain INFO events stay in memory until flush()"""
+        events.llm_request("job", "step", "ollama", "llama3")
+        assert events.log_path.read_bytes() == b""
+
+        events.flush()
+        assert _lines(events.log_path)[0]["type"] == "llm.request"
+
+    def test_error_level_flushes(self, events):
+        """ERROR events are written immediately"""
+        events.emit({"type": "custom.error", "job_id": "job", "level": "ERROR"})
+        assert _lines(events.log_path)[0]["level"] == "ERROR"
+
+    @pytest.mark.parametrize("event_type", sorted(EventEmitter.FLUSH_TYPES))
+    def test_outcome_types_flush(self, events, event_type):
+        """Step/job outcome events are written immediately"""
+        events.emit({"type": event_type, "job_id": "job"})
+        assert _lines(events.log_path)[0]["type"] == event_type
+
+    def test_threshold_flush(self, events):
+        """The buffer is written once it reaches FLUSH_THRESHOLD bytes"""
+        events.FLUSH_THRESHOLD = 500
+        while events.log_path.stat().st_size == 0:
+            events.llm_request("job", "step", "ollama", "llama3")
+            assert len(events._buffer) < 500
+
+        assert len(_lines(events.log_path)) > 1
+
+    def test_timestamp_format(self, events):
+        """Timestamps are ISO8601 UTC with microseconds and a Z suffix"""
+        events.step_succeeded("job", "step", 1.5)
+        ts = _lines(events.log_path)[0]["ts"]
+        assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{6}Z", ts)
+
+    def test_unset_fields_dropped(self, events):
+        """None and empty dict/list fields are omitted; falsy scalars are kept"""
+        events.job_started("job", {"project": "p"})
+        events.step_failed("job", "step", "tool", "", data=None)
+        events.flush()
+
+        started, failed = _lines(events.log_path)
+        assert "provider" not in started and "task" not in started
+        assert started["project"] == "p"
+        assert "data" not in failed
+        assert failed["message"] == ""
+
+
+class TestReadingEvents:
+    """Test iter_events, read_events_head and count_events"""
+
+    @pytest.fixture
+    def log_path(self, tmp_path):
+        events = EventEmitter(tmp_path / "events.jsonl")
+        events.step_started("job", "build", [])
+        events.step_started("job", "deploy", ["build"])
+        events.step_failed("job", "deploy", "tool", 'needs "build"')
+        events.step_succeeded("job", "build", 1.0)
+        events.close()
+        return tmp_path / "events.jsonl"
+
+    def test_prefilter_has_no_false_positives(self, log_path):
+        """A needle found inside another field's value doesn't yield the event"""
+        steps = [e["step"] for e in iter_events(log_path, step_id="build")]
+        assert steps == ["build", "build"]
+
+        failed = list(iter_events(log_path, event_type="step.failed", step_id="build"))
+        assert failed == []
+
+    def test_read_events_head(self, log_path):
+        """read_events_head returns the first n events in order"""
+        head = read_events_head(log_path, 2)
+        assert [e["step"] for e in head] == ["build", "deploy"]
+        assert len(read_events_head(log_path, 100)) == 4
+
+    def test_count_events(self, log_path, tmp_path):
+        """count_events counts non-blank lines; missing logs count as 0"""
+        with open(log_path, "a") as f:
+            f.write("\n")
+        assert count_events(log_path) == 4
+        assert count_events(tmp_path / "missing.jsonl") == 0
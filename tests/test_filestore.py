@@ -5,11 +5,17 @@ from pathlib import Path
 import tempfile
 import shutil
 
-from src.core.filestore import FileStore, compute_sha256, get_filestore
+from src.core.filestore import (
+    FileStore,
+    compute_content_hash,
+    compute_sha256,
+    get_filestore,
+)
 
 
+@pytest.mark.filterwarnings("ignore:compute_sha256 is deprecated:DeprecationWarning")
 class TestComputeSHA256:
-    """Test SHA256 hash computation"""
+    """Test SHA256 hash computation (deprecated helper)"""
     
     def test_hash_string(self):
         """String input produces consistent hash"""
@@ -38,9 +44,18 @@ class TestComputeSHA256:
     def test_hash_known_value(self):
         """Verify against known SHA256 value"""
         # "test" -> 9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08
-        result = compute_sha256("test")
+        with pytest.deprecated_call():
+            result = compute_sha256("test")
         expected = "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08"
         assert result == expected
+    
+    def test_large_string_streamed_hash_matches(self):
+        """Large strings hash the same as their UTF-8 encoding"""
+        content = "héllo wörld ✓ " * 100_000  # > 1 MiB, multi-byte chars
+        encoded = content.encode("utf-8")
+        
+        assert compute_sha256(content) == compute_sha256(encoded)
+        assert compute_content_hash(content) == compute_content_hash(encoded)
 
 
 class TestFileStore:
@@ -62,7 +77,7 @@ class TestFileStore:
         assert result["path"].exists()
         assert result["path"].read_text() == content
         assert result["size_bytes"] == len(content)
-        assert result["sha256"] == compute_sha256(content)
+        assert result["sha256"] == compute_content_hash(content)
         assert result["wrote"] is True
         assert result["reason"] == "created"
     
@@ -80,10 +95,38 @@ class TestFileStore:
         result = temp_store.safe_write("test.txt", "updated", mode="overwrite")
         
         assert result["path"].read_text() == "updated"
-        assert result["sha256"] == compute_sha256("updated")
+        assert result["sha256"] == compute_content_hash("updated")
         assert result["wrote"] is True
         assert result["reason"] == "overwritten"
     
+    def test_overwrite_keeps_exec_bit(self, temp_store):
+        """Overwriting an executable script keeps its mode"""
+        import os
+        import stat
+        
+        path = temp_store.safe_write("run.sh", "#!/bin/sh\necho 1\n")["path"]
+        os.chmod(path, 0o750)
+        temp_store.safe_write("run.sh", "#!/bin/sh\necho 2\n", mode="overwrite")
+        
+        assert stat.S_IMODE(path.stat().st_mode) == 0o750
+        assert path.read_text() == "#!/bin/sh\necho 2\n"
+    
+    def test_overwrite_keeps_symlinks_and_hardlinks(self, temp_store):
+        """Overwrites go through symlinks and keep hardlinks shared"""
+        import os
+        
+        target = temp_store.safe_write("target.txt", "old")["path"]
+        link = temp_store.base_dir / "link.txt"
+        link.symlink_to(target)
+        hard = temp_store.base_dir / "hard.txt"
+        os.link(target, hard)
+        
+        temp_store.safe_write("link.txt", "new", mode="overwrite")
+        
+        assert link.is_symlink()
+        assert target.read_text() == "new"
+        assert hard.read_text() == "new"
+    
     def test_safe_write_create_new_fails_if_exists(self, temp_store):
         """create_new mode fails if file already exists with different content"""
         temp_store.safe_write("test.txt", "original")
@@ -187,6 +230,69 @@ class TestFileStore:
         assert result2["reason"] == "nochange"
         assert result2["sha256"] == result1["sha256"]
 
+    
+    def test_safe_write_leaves_no_lock_files(self, temp_store):
+        """Stores without cross_process don't create lock files next to outputs"""
+        temp_store.safe_write("test.txt", "content")
+        
+        assert [p.name for p in temp_store.base_dir.iterdir()] == ["test.txt"]
+    
+    def test_unchanged_file_not_rehashed(self, temp_store, monkeypatch):
+        """Hashes of files the store wrote are reused while they're unchanged"""
+        from src.core import filestore
+        
+        calls = []
+        real_file_digest = filestore._file_digest
+        monkeypatch.setattr(
+            filestore, "_file_digest",
+            lambda path: calls.append(path) or real_file_digest(path)
+        )
+        
+        temp_store.safe_write("test.txt", "content")
+        result = temp_store.safe_write("test.txt", "content", mode="overwrite")
+        
+        assert result["reason"] == "nochange"
+        assert calls == []
+    
+    def test_hash_xattr_reused_by_new_store(self, temp_store, monkeypatch):
+        """A fresh store trusts the hash xattr instead of rehashing the file"""
+        import os
+        from src.core import filestore
+        
+        content = "x" * 4096
+        result = temp_store.safe_write("big.txt", content)
+        try:
+            os.getxattr(result["path"], filestore.HASH_XATTR)
+        except (AttributeError, OSError):
+            pytest.skip("filesystem has no user xattr support")
+        
+        calls = []
+        monkeypatch.setattr(filestore, "_file_digest", lambda path: calls.append(path))
+        
+        result = FileStore(temp_store.base_dir).safe_write("big.txt", content)
+        
+        assert result["reason"] == "nochange"
+        assert calls == []
+    
+    def test_write_recreates_removed_directory(self, temp_store):
+        """Writes succeed after a directory the store created is removed"""
+        temp_store.safe_write("sub/a.txt", "one")
+        shutil.rmtree(temp_store.base_dir / "sub")
+        
+        result = temp_store.safe_write("sub/b.txt", "two")
+        assert result["path"].read_text() == "two"
+        
+        shutil.rmtree(temp_store.base_dir / "sub")
+        result = temp_store.safe_write("sub/c.txt", "three", mode="append")
+        assert result["path"].read_text() == "three"
+    
+    def test_write_lock_is_per_path(self, temp_store):
+        """Each target path gets its own reusable write lock"""
+        a = temp_store.base_dir / "a.txt"
+        b = temp_store.base_dir / "b.txt"
+        
+        assert temp_store._path_lock(a) is temp_store._path_lock(a)
+        assert temp_store._path_lock(a) is not temp_store._path_lock(b)
 
 class TestFileStoreThreadSafety:
     """Test FileStore behavior under concurrent access"""
@@ -194,8 +300,9 @@ class TestFileStoreThreadSafety:
     @pytest.fixture
     def temp_store(self):
         temp_dir = Path(tempfile.mkdtemp())
-        store = FileStore(temp_dir)
+        store = FileStore(temp_dir, cross_process=True)
         yield store
+        store.close()
         shutil.rmtree(temp_dir)
     
     @pytest.mark.asyncio
@@ -90,8 +90,23 @@ class TestRunManager:
         assert len(manifest["files"]) == 1
         assert manifest["files"][0]["path"] == "main.py"
         assert manifest["files"][0]["sha256"] == "abc123"
+        assert manifest["files"][0]["created_at"] == artifact.created_at.isoformat()
+        assert manifest["started_at"] == job.started_at.isoformat()
         assert manifest["status"] == "succeeded"
     
+    def test_update_manifest_written_immediately(self, temp_runs):
+        """update_manifest replaces manifest.json on disk right away"""
+        manager = RunManager("test_job_immediate", runs_base=temp_runs)
+        spec = JobSpec(project="test", task_description="test", provider="ollama")
+        manager.create_structure(spec)
+        
+        job = Job(job_id="test_job_immediate", spec=spec, status=JobStatus.SUCCEEDED)
+        manager.update_manifest(job)
+        
+        on_disk = json.loads(manager.manifest_path.read_text())
+        assert on_disk["status"] == "succeeded"
+        assert not list(manager.run_dir.glob("manifest.json.tmp*"))
+    
     def test_add_artifact(self, temp_runs):
         """add_artifact writes file and returns artifact object"""
         manager = RunManager("test_job_abc", runs_base=temp_runs)
@@ -103,7 +118,8 @@ class TestRunManager:
         
         # Check artifact properties
         assert artifact.path == "hello.py"
-        assert artifact.sha256 == compute_sha256(content)
+        assert artifact.sha256 == compute_content_hash(content)
+        assert artifact.hash_algo == HASH_ALGO
         assert artifact.size_bytes == len(content)
         assert artifact.media_type == "text/x-python"
         
@@ -175,5 +191,5 @@ def test_create_run():
             manifest_module.RunManager.__init__ = original_init
 
 
-from src.core.filestore import compute_sha256
+from src.core.filestore import HASH_ALGO, compute_content_hash
 